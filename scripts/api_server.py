@@ -0,0 +1,595 @@
+"""
+HTTP API for bulk catalog conversion, for systems that can't drive the Streamlit UI.
+
+Uses the same mapping file and conversion core as the app and the CLI, and never
+imports Streamlit. Uploads are streamed to disk as they arrive. Conversions run in
+a bounded process pool, and new uploads get 429 once the pool and its queue are
+full:
+
+    python api_server.py --port 8600 --workers 4 --max-queue 16
+
+    POST /convert?file_name=catalog.csv[&marketplace=myntra]   (body: the catalog)
+        -> 202 {"job_id": ...}; with &wait=1 the LR file itself once converted.
+        Other options: format, validate, proceed_anyway, chunk_rows, sheet, header_row
+    GET  /jobs/<id>            -> status and summary of a job
+    GET  /jobs/<id>/result     -> the LR file (also /rejected and /errors after
+                                  validation)
+    GET  /health               -> queue depth, pool usage and throughput
+
+    curl -T catalog.csv "localhost:8600/convert?file_name=catalog.csv&wait=1" -o LR.csv
+"""
+
+import argparse
+import asyncio
+import collections
+import logging
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from tornado import httpserver, ioloop, web
+from tornado.log import enable_pretty_logging
+
+from cli import CATALOG_EXTENSIONS, DEFAULT_MAPPING_FILE, output_name
+from converter import convert_file
+from mapping_core import MARKETPLACES
+from mapping_registry import MappingRegistry
+from marketplace_detection import MarketplaceIndex, describe_detection
+from profiling import log_stages, stage_records
+from readers import ExcelOptions, read_header
+from writers import OUTPUT_FORMATS, output_mime
+
+API_LOGGER = "lr_catalog_mapper.api"
+# Uploads larger than this are cut off mid-stream
+MAX_UPLOAD_BYTES = 2 * 1024**3
+# Jobs waiting for a worker (uploads in progress included) beyond the busy workers
+DEFAULT_MAX_QUEUE = 16
+# Suggested client back-off on 429
+RETRY_AFTER_SECONDS = 5
+# Finished jobs and their files are kept this long for download
+JOB_TTL_SECONDS = 60 * 60
+CLEANUP_INTERVAL_SECONDS = 60
+# Window over which /health reports throughput
+THROUGHPUT_WINDOW_SECONDS = 5 * 60
+UPLOAD_FILE = "upload"
+ERRORS_FILE = "errors.csv"
+# Job directory names: uuid4().hex
+_JOB_ID = re.compile(r"[0-9a-f]{32}")
+
+# Per worker process, set up by _init_worker
+_registry = None
+_marketplace_index = (None, None)
+
+
+def _init_worker(mapping_file: str):
+    global _registry
+    _registry = MappingRegistry(mapping_file)
+
+
+def _detection_index() -> MarketplaceIndex:
+    global _marketplace_index
+    version, index = _marketplace_index
+    if version != _registry.version:
+        # Rebuilt only when the mapping file has changed on disk
+        index = MarketplaceIndex(_registry.mapping)
+        _marketplace_index = (_registry.version, index)
+    return index
+
+
+def convert_upload(
+    job_dir: str,
+    file_name: str,
+    marketplace: str,
+    excel_options: ExcelOptions,
+    options: dict,
+) -> (dict, tuple):
+    """
+    Worker entry point: converts the upload in `job_dir`, writes the LR file (and
+    rejected rows/errors when validating) next to it and returns a JSON-able summary
+    plus the conversion's stage timings. A None `marketplace` is detected from the
+    file's headers.
+    """
+    with open(os.path.join(job_dir, UPLOAD_FILE), "rb") as uploaded_file:
+        if marketplace is None:
+            detection = _detection_index().detect(
+                read_header(uploaded_file, file_name, excel_options)
+            )
+            if detection.ambiguous:
+                return {
+                    "status": "rejected",
+                    "error": "could not detect the marketplace "
+                    f"({describe_detection(detection)}); pass marketplace=",
+                }, ()
+            marketplace = detection.marketplace
+        result = convert_file(
+            uploaded_file,
+            file_name,
+            _registry.plan(marketplace),
+            excel_options=excel_options,
+            **options,
+        )
+
+    summary = {
+        "marketplace": marketplace,
+        "missing_headers": result.missing_headers,
+        "suggestions": {
+            column: [{"header": header, "score": score} for header, score in matches]
+            for column, matches in (result.suggestions or {}).items()
+        },
+        "stages": stage_records(file_name, result.stages or ()),
+    }
+    if result.rejected:
+        return dict(
+            summary,
+            status="rejected",
+            error="missing expected headers: " + ", ".join(result.missing_headers),
+        ), result.stages
+
+    output_format = options.get("output_format", "csv")
+    files = {"result": output_name(file_name, output_format)}
+    with result.output, open(os.path.join(job_dir, files["result"]), "wb") as f:
+        shutil.copyfileobj(result.output, f)
+    if result.invalid_rows:
+        files["rejected"] = output_name(f"rejected_{file_name}", output_format)
+        rejected_path = os.path.join(job_dir, files["rejected"])
+        with result.invalid_output, open(rejected_path, "wb") as f:
+            shutil.copyfileobj(result.invalid_output, f)
+        files["errors"] = ERRORS_FILE
+        result.errors.to_csv(os.path.join(job_dir, ERRORS_FILE), index=False)
+    elif result.invalid_output is not None:
+        result.invalid_output.close()
+    return dict(
+        summary,
+        status="done",
+        rows=result.rows,
+        invalid_rows=result.invalid_rows,
+        seconds=round(result.total_seconds, 3),
+        files=files,
+    ), result.stages
+
+
+class Job:
+    """
+    One submitted catalog. `status` moves from receiving through queued and running
+    to done, rejected (missing headers, unknown marketplace) or failed.
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        job_dir: str,
+        file_name: str,
+        marketplace: str,
+        excel_options: ExcelOptions,
+        options: dict,
+    ):
+        self.id = job_id
+        self.dir = job_dir
+        self.file_name = file_name
+        self.marketplace = marketplace
+        self.excel_options = excel_options
+        self.options = options
+        self.status = "receiving"
+        self.bytes_received = 0
+        self.summary = {}
+        self.created = time.time()
+        self.finished = None
+        self.done = asyncio.Event()
+
+    def describe(self) -> dict:
+        return {
+            "job_id": self.id,
+            "file_name": self.file_name,
+            "status": self.status,
+            "bytes_received": self.bytes_received,
+            "created": self.created,
+            "finished": self.finished,
+            **self.summary,
+        }
+
+
+class ConversionService:
+    """
+    Admits jobs up to `workers` running plus `max_queue` waiting (uploads in
+    progress count as waiting) and runs them on a spawn-context process pool. At
+    most `workers` jobs are handed to the pool at a time, so the pool never queues
+    work of its own and the counts in `health()` are exact.
+    """
+
+    def __init__(
+        self,
+        mapping_file: str,
+        work_dir: str,
+        workers: int,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+    ):
+        self.mapping_file = mapping_file
+        self.work_dir = work_dir
+        self.workers = workers
+        self.max_queue = max_queue
+        self.jobs = {}
+        self.admitted = 0
+        self.running = 0
+        self.counts = collections.Counter()
+        self.started = time.time()
+        self._finished = collections.deque()
+        self._slots = asyncio.Semaphore(workers)
+        self._executor = self._new_executor()
+        self._logger = logging.getLogger(API_LOGGER)
+        os.makedirs(work_dir, exist_ok=True)
+        self._sweep_work_dir()
+
+    def _sweep_work_dir(self):
+        # Jobs live in memory only, so files left by a previous run can never be
+        # fetched again; only job directories are removed, nothing else in work_dir
+        for entry in os.scandir(self.work_dir):
+            if _JOB_ID.fullmatch(entry.name) and entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # "spawn" for the same reason as converter.convert_many: no forking of threads
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.mapping_file,),
+        )
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.max_queue
+
+    def admit(self, file_name: str, marketplace: str, excel_options, options) -> Job:
+        """
+        Registers a job whose upload is about to be received, or returns None when
+        the service is at capacity.
+        """
+        if self.admitted >= self.capacity:
+            self.counts["throttled"] += 1
+            return None
+        self.admitted += 1
+        job_id = uuid.uuid4().hex
+        job_dir = os.path.join(self.work_dir, job_id)
+        os.makedirs(job_dir)
+        job = Job(job_id, job_dir, file_name, marketplace, excel_options, options)
+        self.jobs[job.id] = job
+        return job
+
+    def abandon(self, job: Job):
+        """
+        Drops a job whose upload never completed.
+        """
+        if job.status != "receiving":
+            return
+        job.status = "failed"
+        self._release(job)
+        self.jobs.pop(job.id, None)
+        shutil.rmtree(job.dir, ignore_errors=True)
+
+    def submit(self, job: Job):
+        """
+        Queues a fully received job; `job.done` is set once it has finished.
+        """
+        job.status = "queued"
+        ioloop.IOLoop.current().spawn_callback(self._run, job)
+
+    async def _run(self, job: Job):
+        stages = ()
+        try:
+            async with self._slots:
+                job.status = "running"
+                self.running += 1
+                try:
+                    job.summary, stages = await self._convert(job)
+                finally:
+                    self.running -= 1
+            job.status = job.summary.pop("status")
+        except Exception as e:
+            self._logger.exception("Job %s (%s) failed", job.id, job.file_name)
+            job.status = "failed"
+            job.summary = {"error": str(e)}
+        finally:
+            os.remove(os.path.join(job.dir, UPLOAD_FILE))
+            self._release(job)
+        if job.status == "done":
+            self._finished.append((job.finished, job.summary["rows"]))
+        log_stages(
+            job.file_name,
+            stages,
+            job_id=job.id,
+            marketplace=job.summary.get("marketplace"),
+            status=job.status,
+            rows=job.summary.get("rows"),
+        )
+
+    async def _convert(self, job: Job) -> (dict, tuple):
+        loop = asyncio.get_running_loop()
+        executor = self._executor
+        try:
+            return await loop.run_in_executor(
+                executor,
+                convert_upload,
+                job.dir,
+                job.file_name,
+                job.marketplace,
+                job.excel_options,
+                job.options,
+            )
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); later jobs get a fresh pool.
+            # Every job running on the broken pool lands here, so only the first
+            # replaces it, not a pool a concurrent job already replaced.
+            if self._executor is executor:
+                executor.shutdown(wait=False)
+                self._executor = self._new_executor()
+            raise
+
+    def _release(self, job: Job):
+        self.admitted -= 1
+        self.counts[job.status] += 1
+        job.finished = time.time()
+        job.done.set()
+
+    def cleanup(self):
+        """
+        Removes jobs (and their files) that finished more than JOB_TTL_SECONDS ago.
+        """
+        expired = time.time() - JOB_TTL_SECONDS
+        for job_id, job in list(self.jobs.items()):
+            if job.finished is not None and job.finished < expired:
+                del self.jobs[job_id]
+                shutil.rmtree(job.dir, ignore_errors=True)
+
+    def health(self) -> dict:
+        now = time.time()
+        window_start = now - THROUGHPUT_WINDOW_SECONDS
+        while self._finished and self._finished[0][0] < window_start:
+            self._finished.popleft()
+        window = min(THROUGHPUT_WINDOW_SECONDS, now - self.started) or 1.0
+        statuses = collections.Counter(job.status for job in self.jobs.values())
+        return {
+            "status": "ok",
+            "uptime_seconds": round(now - self.started),
+            "workers": self.workers,
+            "running": self.running,
+            "queue_depth": self.admitted - self.running,
+            "receiving": statuses["receiving"],
+            "queued": statuses["queued"],
+            "max_queue": self.max_queue,
+            "accepting": self.admitted < self.capacity,
+            "jobs": {
+                status: self.counts[status]
+                for status in ("done", "rejected", "failed", "throttled")
+            },
+            "throughput": {
+                "window_seconds": round(window),
+                "jobs_per_minute": round(len(self._finished) * 60 / window, 2),
+                "rows_per_second": round(sum(rows for _, rows in self._finished) / window),
+            },
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _flag(value: str) -> bool:
+    return value.lower() in ("1", "true", "yes", "on")
+
+
+class BaseHandler(web.RequestHandler):
+    def initialize(self, service: ConversionService):
+        self.service = service
+
+    def write_error(self, status_code: int, **kwargs):
+        self.finish({"error": self._reason})
+
+    def find_job(self, job_id: str) -> Job:
+        job = self.service.jobs.get(job_id)
+        if job is None:
+            raise web.HTTPError(404, reason="Unknown job")
+        return job
+
+    async def send_file(self, path: str, download_name: str, content_type: str):
+        self.set_header("Content-Type", content_type)
+        self.set_header("Content-Disposition", f'attachment; filename="{download_name}"')
+        with open(path, "rb") as f:
+            while chunk := f.read(1024 * 1024):
+                self.write(chunk)
+                await self.flush()
+        self.finish()
+
+
+@web.stream_request_body
+class ConvertHandler(BaseHandler):
+    """
+    POST /convert: the request body is the catalog file, written to disk chunk by
+    chunk as it arrives; the job is only admitted if the service has capacity.
+    """
+
+    job = None
+    upload = None
+
+    def prepare(self):
+        file_name = os.path.basename(self.get_query_argument("file_name", ""))
+        if not file_name.endswith(CATALOG_EXTENSIONS):
+            raise web.HTTPError(400, reason="file_name must be a .csv or .xlsx name")
+        marketplace = self.get_query_argument("marketplace", None) or None
+        if marketplace is not None and marketplace not in MARKETPLACES:
+            raise web.HTTPError(
+                400, reason=f"marketplace must be one of {', '.join(MARKETPLACES)}"
+            )
+        output_format = self.get_query_argument("format", "csv")
+        if output_format not in OUTPUT_FORMATS:
+            raise web.HTTPError(
+                400, reason=f"format must be one of {', '.join(OUTPUT_FORMATS)}"
+            )
+        try:
+            chunk_rows = int(self.get_query_argument("chunk_rows", 0)) or None
+            header_row = int(self.get_query_argument("header_row", 1)) - 1
+        except ValueError:
+            raise web.HTTPError(400, reason="chunk_rows and header_row must be integers")
+        sheet = self.get_query_argument("sheet", None)
+        options = {
+            "output_format": output_format,
+            "proceed_anyway": _flag(self.get_query_argument("proceed_anyway", "")),
+            "validate": _flag(self.get_query_argument("validate", "")),
+            "chunksize": chunk_rows,
+        }
+
+        excel_options = ExcelOptions(
+            sheet_name=sheet if sheet is not None else 0, header_row=header_row
+        )
+        self.job = self.service.admit(file_name, marketplace, excel_options, options)
+        if self.job is None:
+            # Refused before the body is read, so a busy service costs clients no upload
+            self.set_status(429)
+            self.set_header("Retry-After", str(RETRY_AFTER_SECONDS))
+            self.finish({"error": "Conversion queue is full", **self.service.health()})
+            return
+        self.upload = open(os.path.join(self.job.dir, UPLOAD_FILE), "wb")
+
+    def data_received(self, chunk: bytes):
+        self.upload.write(chunk)
+        self.job.bytes_received += len(chunk)
+
+    async def post(self):
+        self.upload.close()
+        job = self.job
+        if job.bytes_received == 0:
+            raise web.HTTPError(400, reason="Empty request body")
+        self.service.submit(job)
+        self.job = None
+        if not _flag(self.get_query_argument("wait", "")):
+            self.set_status(202)
+            self.set_header("Location", f"/jobs/{job.id}")
+            self.finish(job.describe())
+            return
+        await job.done.wait()
+        if job.status != "done":
+            self.set_status(422 if job.status == "rejected" else 500)
+            self.finish(job.describe())
+            return
+        self.set_header("X-Job-Id", job.id)
+        await self.send_file(
+            os.path.join(job.dir, job.summary["files"]["result"]),
+            job.summary["files"]["result"],
+            output_mime(job.options["output_format"]),
+        )
+
+    # `curl -T` and many HTTP clients upload files with PUT
+    put = post
+
+    def _abandon_upload(self):
+        # `job` is cleared once submitted, so this only drops unsubmitted uploads
+        if self.upload is not None:
+            self.upload.close()
+        if self.job is not None:
+            self.service.abandon(self.job)
+            self.job = None
+
+    def on_connection_close(self):
+        # The client went away (or exceeded MAX_UPLOAD_BYTES) mid-upload
+        self._abandon_upload()
+
+    def on_finish(self):
+        # Answered without submitting the job, e.g. with an error
+        self._abandon_upload()
+
+
+class JobHandler(BaseHandler):
+    def get(self, job_id: str):
+        self.finish(self.find_job(job_id).describe())
+
+
+class JobFileHandler(BaseHandler):
+    async def get(self, job_id: str, part: str):
+        job = self.find_job(job_id)
+        if job.status in ("receiving", "queued", "running"):
+            raise web.HTTPError(409, reason=f"Job is {job.status}")
+        name = job.summary.get("files", {}).get(part)
+        if name is None:
+            raise web.HTTPError(404, reason=f"Job has no {part} file ({job.status})")
+        if part == "errors":
+            content_type = "text/csv"
+        else:
+            content_type = output_mime(job.options["output_format"])
+        await self.send_file(os.path.join(job.dir, name), name, content_type)
+
+
+class HealthHandler(BaseHandler):
+    def get(self):
+        self.finish(self.service.health())
+
+
+def make_app(service: ConversionService) -> web.Application:
+    handler_args = {"service": service}
+    return web.Application(
+        [
+            (r"/convert", ConvertHandler, handler_args),
+            (r"/jobs/([0-9a-f]+)", JobHandler, handler_args),
+            (r"/jobs/([0-9a-f]+)/(result|rejected|errors)", JobFileHandler, handler_args),
+            (r"/health", HealthHandler, handler_args),
+        ]
+    )
+
+
+async def serve(args):
+    service = ConversionService(
+        args.mapping,
+        args.work_dir,
+        args.workers,
+        args.max_queue,
+    )
+    server = httpserver.HTTPServer(make_app(service), max_body_size=MAX_UPLOAD_BYTES)
+    server.listen(args.port, args.host)
+    ioloop.PeriodicCallback(service.cleanup, CLEANUP_INTERVAL_SECONDS * 1000).start()
+    logging.getLogger(API_LOGGER).info(
+        "Listening on %s:%s with %s workers", args.host, args.port, args.workers
+    )
+    try:
+        await asyncio.Event().wait()
+    finally:
+        service.shutdown()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="lr-catalog-api", description="Serve catalog conversion over HTTP."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--mapping", default=DEFAULT_MAPPING_FILE)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=max(1, (os.cpu_count() or 1) - 1),
+        help="Conversions running at once, one process each",
+    )
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=DEFAULT_MAX_QUEUE,
+        help="Jobs waiting for a worker before uploads are refused with 429",
+    )
+    parser.add_argument(
+        "--work-dir",
+        default=os.path.join(tempfile.gettempdir(), "lr-catalog-api"),
+        help="Where uploads and converted files are kept; job files left there by "
+        "an earlier run are removed at startup, so give each server its own",
+    )
+    return parser
+
+
+def main(argv=None):
+    enable_pretty_logging()
+    asyncio.run(serve(build_parser().parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
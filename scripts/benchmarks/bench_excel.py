@@ -0,0 +1,110 @@
+"""
+Benchmark: Excel ingestion engines on input_files/myntra.xlsx replicated to N rows.
+
+Usage (from the scripts directory):
+    python benchmarks/bench_excel.py --rows 100000
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+import openpyxl
+import pandas as pd
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from mapping_core import compile_plan, load_mapping  # noqa: E402
+from readers import HAS_CALAMINE, ExcelOptions, read_excel_catalog  # noqa: E402
+
+# A blank row is inserted after every this many data rows (and one at the end), so
+# the equality check covers how each engine treats blank rows
+BLANK_ROW_EVERY = 1_000
+
+
+def replicated_workbook(path: str, rows: int) -> bytes:
+    """
+    Writes the sample sheet's data rows repeatedly into a new workbook, with blank
+    rows in between and after them.
+    """
+    source = openpyxl.load_workbook(path, read_only=True)
+    sample = list(source.worksheets[0].iter_rows(values_only=True))
+    source.close()
+    header, data = sample[0], sample[1:]
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(header)
+    for i in range(rows):
+        sheet.append(data[i % len(data)])
+        if (i + 1) % BLANK_ROW_EVERY == 0:
+            sheet.append([None] * len(header))
+    sheet.append([None] * len(header))
+    output = io.BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--input", default=os.path.join(SCRIPTS_DIR, "input_files", "myntra.xlsx")
+    )
+    parser.add_argument("--marketplace", default="myntra")
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    data, build_seconds = timed(lambda: replicated_workbook(args.input, args.rows))
+    print(f"built {args.rows}-row workbook ({len(data) / 1e6:.1f} MB) in {build_seconds:.1f}s")
+    usecols = compile_plan(
+        load_mapping(os.path.join(SCRIPTS_DIR, "mapping.json")), args.marketplace
+    ).used_columns
+
+    cases = [
+        ("pandas openpyxl (baseline)", lambda: pd.read_excel(io.BytesIO(data), dtype=str)),
+        (
+            "openpyxl streaming",
+            lambda: read_excel_catalog(io.BytesIO(data), ExcelOptions(engine="openpyxl")),
+        ),
+        (
+            "openpyxl streaming + usecols",
+            lambda: read_excel_catalog(
+                io.BytesIO(data), ExcelOptions(engine="openpyxl"), usecols=usecols
+            ),
+        ),
+    ]
+    if HAS_CALAMINE:
+        cases += [
+            (
+                "calamine",
+                lambda: read_excel_catalog(io.BytesIO(data), ExcelOptions(engine="calamine")),
+            ),
+            (
+                "calamine + usecols",
+                lambda: read_excel_catalog(
+                    io.BytesIO(data), ExcelOptions(engine="calamine"), usecols=usecols
+                ),
+            ),
+        ]
+
+    baseline = None
+    for name, fn in cases:
+        df, seconds = timed(fn)
+        if baseline is None:
+            baseline = df
+        else:
+            assert df.equals(baseline[df.columns]), name
+        print(f"{name:30s}: {seconds:8.2f}s  {df.shape}")
+
+
+if __name__ == "__main__":
+    main()
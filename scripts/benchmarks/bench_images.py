@@ -0,0 +1,134 @@
+"""
+Benchmark: image URL checking against a local HTTP stand-in server.
+
+Builds a catalog where every size of a style shares the style's five images,
+serves them from a stub server on localhost (a share of them 404, some refuse
+HEAD, all with a small latency) and checks that only unique URLs are requested
+and that a second run is served entirely from the TTL cache.
+
+Usage (from the scripts directory):
+    python benchmarks/bench_images.py --skus 200000 --sizes 6
+"""
+
+import argparse
+import http.server
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from image_check import (  # noqa: E402
+    IMAGE_FIELDS,
+    ImageCheckCache,
+    broken_images,
+    check_urls,
+    unique_image_urls,
+)
+
+
+class StubImageServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    latency = 0.0
+    requests = 0
+    lock = threading.Lock()
+
+
+class StubImageHandler(http.server.BaseHTTPRequestHandler):
+    """
+    /img/<n>.jpg answers 200, /missing/<n>.jpg 404, /nohead/<n>.jpg rejects HEAD
+    with 405 and serves one byte to a ranged GET.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self, code: int, body: bytes = b""):
+        with self.server.lock:
+            self.server.requests += 1
+        time.sleep(self.server.latency)
+        self.send_response(code)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        if self.path.startswith("/missing/"):
+            self._reply(404)
+        elif self.path.startswith("/nohead/"):
+            self._reply(405)
+        else:
+            self._reply(200)
+
+    def do_GET(self):
+        self._reply(404 if self.path.startswith("/missing/") else 206, b"\xff")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def build_catalog(base_url: str, skus: int, sizes: int, missing_share: float) -> pd.DataFrame:
+    styles = -(-skus // sizes)
+    style_ids = np.repeat(np.arange(styles), sizes)[:skus]
+    rng = np.random.default_rng(0)
+    kinds = rng.choice(
+        ["img", "missing", "nohead"],
+        size=(styles, len(IMAGE_FIELDS)),
+        p=[1 - missing_share - 0.01, missing_share, 0.01],
+    )
+    catalog = {"Vendor Style Code": [f"S{style}-{i}" for i, style in enumerate(style_ids)]}
+    for n, field in enumerate(IMAGE_FIELDS):
+        urls = np.array(
+            [f"{base_url}/{kinds[style, n]}/{style}-{n}.jpg" for style in range(styles)],
+            dtype=object,
+        )
+        catalog[field] = urls[style_ids]
+    return pd.DataFrame(catalog)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--skus", type=int, default=200_000)
+    parser.add_argument("--sizes", type=int, default=6, help="SKUs sharing a style's images")
+    parser.add_argument("--missing-share", type=float, default=0.02)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--connections", type=int, default=32)
+    args = parser.parse_args()
+
+    server = StubImageServer(("127.0.0.1", 0), StubImageHandler)
+    server.latency = args.latency_ms / 1000
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    catalog = build_catalog(base_url, args.skus, args.sizes, args.missing_share)
+    cache = ImageCheckCache()
+    start = time.perf_counter()
+    urls = unique_image_urls(catalog)
+    dedupe_seconds = time.perf_counter() - start
+    print(
+        f"{len(catalog)} rows, {len(catalog) * len(IMAGE_FIELDS)} image references, "
+        f"{len(urls)} unique URLs (dedupe {dedupe_seconds:.2f}s)"
+    )
+
+    for run in ("cold", "cached"):
+        before = server.requests
+        start = time.perf_counter()
+        results = check_urls(urls, cache, max_connections=args.connections)
+        broken = broken_images(catalog, results)
+        print(
+            f"{run}: {server.requests - before} HTTP requests in "
+            f"{time.perf_counter() - start:.2f}s, "
+            f"{sum(not status.ok for status in results.values())} broken URLs "
+            f"referenced by {broken['row'].nunique()} rows"
+        )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark: peak RSS of read + transform with object vs Arrow-backed strings.
+
+Builds a Myntra catalog of N rows from input_files/myntra.csv, then measures each
+mode in a fresh subprocess so peak RSS readings don't leak between runs.
+
+Usage (from the scripts directory):
+    python benchmarks/bench_memory.py --rows 500000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+MODES = {
+    "object": {"arrow_strings": False},
+    "arrow": {"arrow_strings": True},
+}
+
+
+def build_catalog(source: str, rows: int, path: str, block_rows: int = 50_000):
+    """
+    Replicates the sample rows, suffixing per-row identifiers and free-text fields
+    so values are not simply repeated (repeats would flatter the object parser,
+    which shares identical strings).
+    """
+    import pandas as pd
+
+    sample = pd.read_csv(source, dtype=str)
+    unique_columns = [
+        column
+        for column in ("vendorSkuCode", "styleId", "SKUCode", "GTIN", "Product Details",
+                       "styleNote", "productDisplayName")
+        if column in sample.columns
+    ]
+    for start in range(0, rows, block_rows):
+        size = min(block_rows, rows - start)
+        repeats = -(-size // len(sample))
+        block = pd.concat([sample] * repeats, ignore_index=True).iloc[:size]
+        suffix = pd.Series(range(start, start + size), index=block.index).astype(str)
+        for column in unique_columns:
+            block[column] = block[column].fillna("") + " " + suffix
+        block.to_csv(path, mode="a", index=False, header=start == 0)
+
+
+def current_rss_mb() -> float:
+    # Linux only; the baseline must be current RSS, not the earlier peak
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def measure(path: str, marketplace: str, mode: str, project: bool) -> dict:
+    from mapping_core import compile_plan, load_mapping, transform_catalog
+    from readers import peak_rss_mb, read_catalog
+
+    plan = compile_plan(load_mapping(os.path.join(SCRIPTS_DIR, "mapping.json")), marketplace)
+    baseline = current_rss_mb()
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        df = read_catalog(
+            f,
+            path,
+            usecols=plan.used_columns if project else None,
+            **MODES[mode],
+        )
+    transformed_df, _ = transform_catalog(df, plan)
+    return {
+        "mode": mode,
+        "projected": project,
+        "rows": len(transformed_df),
+        "seconds": round(time.perf_counter() - start, 2),
+        "peak_rss_delta_mb": round(peak_rss_mb() - baseline, 1),
+        "frame_mb": round(df.memory_usage(deep=True).sum() / 1e6, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--input", default=os.path.join(SCRIPTS_DIR, "input_files", "myntra.csv")
+    )
+    parser.add_argument("--marketplace", default="myntra")
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--child", nargs=3, metavar=("PATH", "MODE", "PROJECT"))
+    args = parser.parse_args()
+
+    if args.child:
+        path, mode, project = args.child
+        print(json.dumps(measure(path, args.marketplace, mode, project == "1")))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "catalog.csv")
+        build_catalog(args.input, args.rows, path)
+        print(f"rows={args.rows} file={os.path.getsize(path) / 1e6:.0f} MB")
+        for project in ("0", "1"):
+            for mode in MODES:
+                output = subprocess.run(
+                    [sys.executable, __file__, "--marketplace", args.marketplace,
+                     "--child", path, mode, project],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                ).stdout
+                result = json.loads(output)
+                print(
+                    f"  {mode:7s} projected={result['projected']!s:5s}"
+                    f" peak RSS +{result['peak_rss_delta_mb']:8.1f} MB"
+                    f" frame {result['frame_mb']:8.1f} MB  {result['seconds']:6.2f}s"
+                )
+
+
+if __name__ == "__main__":
+    main()
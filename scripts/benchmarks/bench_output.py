@@ -0,0 +1,58 @@
+"""
+Benchmark: output size and write time of CSV vs Parquet vs Arrow IPC.
+
+Uses input_files/LR_myntra.csv (already in LR format), as-is and replicated.
+
+Usage (from the scripts directory):
+    python benchmarks/bench_output.py --rows 0 100000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from writers import OUTPUT_FORMATS, write_output  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--input", default=os.path.join(SCRIPTS_DIR, "input_files", "LR_myntra.csv")
+    )
+    parser.add_argument(
+        "--rows",
+        type=int,
+        nargs="+",
+        default=[0, 100_000],
+        help="Row counts to test; 0 means the sample file as-is",
+    )
+    args = parser.parse_args()
+
+    sample = pd.read_csv(args.input, dtype=str)
+    for rows in args.rows:
+        if rows:
+            repeats = -(-rows // len(sample))
+            df = pd.concat([sample] * repeats, ignore_index=True).iloc[:rows]
+        else:
+            df = sample
+        print(f"rows={len(df)}")
+        csv_size = None
+        for output_format in OUTPUT_FORMATS:
+            start = time.perf_counter()
+            size = len(write_output(df, output_format).getvalue())
+            seconds = time.perf_counter() - start
+            csv_size = csv_size or size
+            print(
+                f"  {output_format:8s}: {size:>12,} bytes ({size / csv_size:7.2%} of CSV)"
+                f"  write {seconds * 1000:8.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
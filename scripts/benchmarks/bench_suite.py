@@ -0,0 +1,244 @@
+"""
+Benchmark suite: read, transform and write times per marketplace, format and size.
+
+Generates synthetic catalogs (see catalog_generator.py) for each marketplace at
+each row count, writes them as CSV and XLSX, and times reading them (projected to
+the mapped columns, as the app does), transform_catalog with the mapping's rules,
+and writing the LR CSV. Each stage is the best of --repeat runs. Results go to a
+JSON file stamped with the commit, so runs can be compared with --compare.
+
+Usage (from the scripts directory):
+    python benchmarks/bench_suite.py --rows 1000 10000 100000 1000000
+    python benchmarks/bench_suite.py --rows 1000 10000 --formats csv \\
+        --compare benchmarks/results/<earlier commit>.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from catalog_generator import generate_catalog, write_catalog  # noqa: E402
+from mapping_core import (  # noqa: E402
+    MARKETPLACES,
+    compile_plan,
+    load_mapping,
+    load_rules,
+    transform_catalog,
+)
+from readers import default_excel_engine, read_catalog  # noqa: E402
+from writers import write_output  # noqa: E402
+
+RESULTS_DIR = os.path.join(SCRIPTS_DIR, "benchmarks", "results")
+FORMATS = ("csv", "xlsx")
+STAGES = ("read", "transform", "write")
+# Writing a 1M-row workbook takes longer than the rest of the suite together
+XLSX_MAX_ROWS = 100_000
+# Stages faster than this in the baseline are too noisy to flag as regressions
+MIN_COMPARED_SECONDS = 0.05
+
+
+def git_commit() -> dict:
+    def git(*args):
+        return subprocess.run(
+            ["git", *args], cwd=SCRIPTS_DIR, capture_output=True, text=True
+        ).stdout.strip()
+
+    try:
+        return {
+            "commit": git("rev-parse", "HEAD") or None,
+            "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        }
+    except OSError:
+        return {"commit": None, "dirty": None}
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "pyarrow": pyarrow.__version__,
+        "excel_engine": default_excel_engine(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def best_of(fn, repeat: int):
+    """
+    Runs `fn` `repeat` times; returns its last result and the fastest time.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+
+def run_case(path: str, plan, repeat: int) -> dict:
+    def read():
+        with open(path, "rb") as f:
+            return read_catalog(f, path, usecols=plan.used_columns)
+
+    df, read_seconds = best_of(read, repeat)
+    (transformed_df, _), transform_seconds = best_of(
+        lambda: transform_catalog(df, plan), repeat
+    )
+    output, write_seconds = best_of(lambda: write_output(transformed_df, "csv"), repeat)
+    return {
+        "input_bytes": os.path.getsize(path),
+        "output_bytes": len(output.getvalue()),
+        "seconds": {
+            "read": round(read_seconds, 4),
+            "transform": round(transform_seconds, 4),
+            "write": round(write_seconds, 4),
+        },
+    }
+
+
+def case_key(case: dict) -> tuple:
+    return case["marketplace"], case["format"], case["rows"]
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> int:
+    """
+    Prints each stage's time relative to the baseline run and returns how many
+    are slower by more than `threshold` (a ratio, e.g. 1.2 for 20%).
+    """
+    baseline_cases = {case_key(case): case for case in baseline["cases"]}
+    regressions = 0
+    print(f"\nvs {baseline.get('commit') or 'baseline'}:")
+    for case in results["cases"]:
+        previous = baseline_cases.get(case_key(case))
+        if previous is None:
+            continue
+        ratios = []
+        for stage in STAGES:
+            before, after = previous["seconds"].get(stage), case["seconds"][stage]
+            if not before:
+                continue
+            ratio = after / before
+            flag = ""
+            if ratio > threshold and before >= MIN_COMPARED_SECONDS:
+                regressions += 1
+                flag = " !"
+            ratios.append(f"{stage} {ratio:5.2f}x{flag}")
+        print(f"  {'/'.join(map(str, case_key(case))):28s} " + "  ".join(ratios))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument(
+        "--marketplaces", nargs="+", choices=MARKETPLACES, default=list(MARKETPLACES)
+    )
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument(
+        "--extra-columns", type=int, default=40, help="Unmapped columns per catalog"
+    )
+    parser.add_argument(
+        "--xlsx-max-rows",
+        type=int,
+        default=XLSX_MAX_ROWS,
+        help="Skip XLSX cases above this many rows",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "-o", "--output", help="Results JSON (default: results/<commit>.json)"
+    )
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="Slowdown ratio reported as a regression by --compare",
+    )
+    args = parser.parse_args()
+
+    mapping_path = os.path.join(SCRIPTS_DIR, "mapping.json")
+    mapping_dict = load_mapping(mapping_path)
+    rules = load_rules(mapping_path)
+    results = {
+        **git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": environment(),
+        "parameters": {
+            "extra_columns": args.extra_columns,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "cases": [],
+    }
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        for marketplace in args.marketplaces:
+            plan = compile_plan(mapping_dict, marketplace, rules)
+            for rows in args.rows:
+                formats = [
+                    output_format
+                    for output_format in args.formats
+                    if output_format != "xlsx" or rows <= args.xlsx_max_rows
+                ]
+                if not formats:
+                    continue
+                df = generate_catalog(
+                    marketplace, rows, mapping_dict, args.extra_columns, args.seed
+                )
+                for output_format in formats:
+                    path = os.path.join(work_dir, f"{marketplace}-{rows}.{output_format}")
+                    write_catalog(df, path)
+                    case = {
+                        "marketplace": marketplace,
+                        "format": output_format,
+                        "rows": rows,
+                        "columns": df.shape[1],
+                        **run_case(path, plan, args.repeat),
+                    }
+                    os.remove(path)
+                    results["cases"].append(case)
+                    seconds = case["seconds"]
+                    print(
+                        f"{marketplace:8s} {output_format:4s} {rows:>9,} rows "
+                        f"({case['input_bytes'] / 1e6:8.1f} MB): "
+                        + "  ".join(f"{stage} {seconds[stage]:8.3f}s" for stage in STAGES)
+                    )
+                del df
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        name = (results["commit"] or "uncommitted")[:12]
+        output = os.path.join(
+            RESULTS_DIR, f"{name}{'-dirty' if results['dirty'] else ''}.json"
+        )
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"results -> {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"{regressions} stage timings regressed beyond {args.threshold}x")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
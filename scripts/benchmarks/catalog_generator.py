@@ -0,0 +1,301 @@
+"""
+Synthetic marketplace catalogs for benchmarks.
+
+Builds Myntra/Ajio/Flipkart catalogs with the headers mapping.json expects for the
+marketplace, plus a configurable number of unmapped attribute columns (real
+exports carry many more columns than LR reads). Values follow the shape of real
+uploads: SKUs are sizes of a style and share its brand, colour, prices,
+description and images; attributes come from small vocabularies; GTINs and SKU
+codes are unique; descriptions are long free text, one per style. The same seed
+always produces the same catalog.
+
+Usage (from the scripts directory):
+    python benchmarks/catalog_generator.py --marketplace ajio --rows 100000 -o ajio.csv
+    python benchmarks/catalog_generator.py --marketplace flipkart --rows 50000 -o fk.xlsx
+"""
+
+import argparse
+import os
+import sys
+from typing import NamedTuple
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from mapping_core import MARKETPLACES, load_mapping  # noqa: E402
+from readers import is_csv  # noqa: E402
+
+SIZES = ("XS", "S", "M", "L", "XL", "XXL", "3XL")
+# Share of optional values left blank, as sellers rarely fill in every attribute
+BLANK_SHARE = 0.2
+# Range of words in a style's description
+DESCRIPTION_WORDS = (40, 90)
+
+VOCABULARIES = {
+    "Brand Name": [f"Brand{i:03d}" for i in range(60)],
+    "Color": [
+        "White", "Black", "Navy Blue", "Red", "Maroon", "Pink", "Peach", "Yellow",
+        "Mustard", "Olive", "Green", "Teal", "Blue", "Lavender", "Purple", "Grey",
+        "Charcoal", "Beige", "Cream", "Brown", "Rust", "Orange", "Coral", "Gold",
+    ],
+    "Material": [
+        "Cotton", "Polyester", "Viscose Rayon", "Linen", "Silk", "Georgette", "Crepe",
+        "Chiffon", "Denim", "Modal", "Nylon", "Wool", "Cotton Blend", "Satin",
+    ],
+    "Stock / Inventory": ["Sellable", "Pre-Order", "Out of Stock"],
+    "Print & Pattern": [
+        "Solid", "Floral", "Striped", "Checked", "Geometric", "Abstract", "Polka Dots",
+        "Ethnic Motifs", "Animal", "Tie and Dye",
+    ],
+    "Work": ["Embroidered", "Sequinned", "Mirror Work", "Printed", "Lace", "Gotta Patti"],
+    "Lining Material": ["Cotton", "Polyester", "Satin", "Unlined"],
+    "Sleeve Type": [
+        "Regular Sleeves", "Puff Sleeves", "Bell Sleeves", "Cap Sleeves", "Sleeveless",
+        "Flared Sleeves", "Bishop Sleeves", "Roll-Up Sleeves",
+    ],
+    "Neck Type": [
+        "Round Neck", "V-Neck", "Mandarin Collar", "Shirt Collar", "Boat Neck",
+        "Square Neck", "Sweetheart Neck", "Halter Neck", "Keyhole Neck",
+    ],
+    "Type": ["A-Line", "Fit and Flare", "Sheath", "Maxi", "Wrap", "Shirt", "Bodycon"],
+    "Pockets": ["0", "1", "2", "3"],
+    "Care": ["Machine Wash", "Hand Wash", "Dry Clean", "Gentle Machine Wash"],
+    "Transparency of Fabric": ["Opaque", "Semi-Sheer", "Sheer"],
+    "Color Family": ["Bright", "Pastel", "Earthy", "Dark", "Neutral", "Metallic"],
+    "Occasion": ["Casual", "Party", "Work", "Festive", "Beach", "Lounge"],
+    "HSN Code": ["62044300", "62044400", "61044300", "62114300", "61044400", "6204"],
+    "Closure": ["Zip", "Button", "Hook and Eye", "Tie-Up", "Slip-On", "Drawstring"],
+    "Ideal for": ["Women", "Girls", "Men", "Unisex"],
+    "Country Of Origin": ["India", "Bangladesh", "China", "Vietnam", "Sri Lanka"],
+    "Fit": ["Regular Fit", "Slim Fit", "Relaxed Fit", "Oversized", "Tailored Fit"],
+    "Model Details": [
+        f"Model is {height} cm tall and wears size {size}"
+        for height in (165, 170, 175, 178)
+        for size in SIZES[:5]
+    ],
+}
+# Fields with one value per style rather than per SKU
+STYLE_FIELDS = {
+    "Brand Name", "Color", "Material", "Print & Pattern", "Work", "Lining Material",
+    "Sleeve Type", "Neck Type", "Type", "Pockets", "Care", "Transparency of Fabric",
+    "Color Family", "Occasion", "HSN Code", "Closure", "Ideal for",
+    "Country Of Origin", "Fit", "Model Details",
+}
+# Fields sellers always fill in
+REQUIRED_FIELDS = {
+    "Brand Name", "Color Grouping Code", "Vendor Style Code", "Size", "Color",
+    "MRP", "Selling Price", "Product Details", "Image URL 1", "HSN Code", "GTIN",
+}
+PRICE_POINTS = np.array(
+    [299, 399, 499, 599, 799, 899, 999, 1199, 1299, 1499, 1799, 1999, 2299, 2499,
+     2999, 3499, 3999, 4499, 4999, 5999, 7999, 9999]
+)
+DESCRIPTION_VOCABULARY = np.array(
+    (
+        "soft breathable fabric with a flattering silhouette tailored for all day comfort "
+        "features a relaxed fit and subtle texture that pairs easily with sneakers heels "
+        "or flats finished with neat stitching at the hem and a lightweight drape ideal "
+        "for warm weather evenings weekend brunches and festive gatherings detailed with "
+        "contrast piping gathered waist pleated panels delicate embroidery and a concealed "
+        "zip closure the classic colour palette and timeless cut make it a versatile "
+        "wardrobe staple that transitions from day to night"
+    ).split()
+)
+UNIT_SUFFIXES = {
+    # Ajio sellers often type units into the dimension columns
+    "ajio": ("", " cm", " cms", " inch"),
+}
+
+
+def marketplace_columns(mapping_dict: dict, marketplace: str) -> dict:
+    """
+    {marketplace column: LR field} for the columns mapping.json expects. Where two
+    fields share a column (Flipkart's EAN/UPC), the later one decides its values.
+    """
+    columns = {}
+    for lr_field, mapping in mapping_dict.items():
+        column = mapping.get(marketplace)
+        if column:
+            columns[column] = lr_field
+    return columns
+
+
+def _style_descriptions(rng: np.random.Generator, styles: int) -> np.ndarray:
+    lengths = rng.integers(*DESCRIPTION_WORDS, size=styles)
+    words = rng.integers(
+        0, len(DESCRIPTION_VOCABULARY), size=(styles, DESCRIPTION_WORDS[1])
+    )
+    return np.array(
+        [
+            " ".join(DESCRIPTION_VOCABULARY[row[:length]]).capitalize() + "."
+            for row, length in zip(words, lengths)
+        ],
+        dtype=object,
+    )
+
+
+def _with_blanks(
+    rng: np.random.Generator, values: np.ndarray, share: float, groups: np.ndarray = None
+) -> np.ndarray:
+    """
+    Blanks about `share` of the values; with `groups`, a group is blanked as a whole.
+    """
+    values = values.astype(object)
+    if groups is None:
+        values[rng.random(len(values)) < share] = None
+    elif len(groups):
+        values[(rng.random(groups[-1] + 1) < share)[groups]] = None
+    return values
+
+
+class _Styles(NamedTuple):
+    """
+    Per-row style and size, and the style-level prices shared by MRP and Selling Price.
+    """
+
+    ids: np.ndarray
+    sizes: np.ndarray
+    count: int
+    mrp: np.ndarray
+    selling_price: np.ndarray
+
+
+def _styles(rng: np.random.Generator, rows: int) -> _Styles:
+    sizes_per_style = rng.integers(3, len(SIZES) + 1, size=-(-rows // 3))
+    ids = np.repeat(np.arange(len(sizes_per_style)), sizes_per_style)[:rows]
+    count = int(ids[-1]) + 1 if rows else 0
+    # Position of each SKU within its style picks its size
+    starts = np.concatenate(([0], np.cumsum(sizes_per_style)[:-1]))
+    sizes = np.array(SIZES)[np.arange(rows) - starts[ids]]
+    mrp = rng.choice(PRICE_POINTS, size=count)
+    discount = rng.choice([0.0, 0.1, 0.2, 0.3, 0.4, 0.5], size=count)
+    return _Styles(ids, sizes, count, mrp, np.floor(mrp * (1 - discount)).astype(int))
+
+
+def _style_codes(prefix: str, styles: _Styles) -> np.ndarray:
+    return np.char.add(prefix, (100_000 + styles.ids).astype(str))
+
+
+def _field_values(
+    rng: np.random.Generator, lr_field: str, marketplace: str, styles: _Styles
+) -> np.ndarray:
+    """
+    Values of one LR field for every row, or None when the field has no generator.
+    """
+    rows = len(styles.ids)
+
+    def per_style(values) -> np.ndarray:
+        return np.asarray(values).astype(str).astype(object)[styles.ids]
+
+    if lr_field in VOCABULARIES:
+        vocabulary = np.array(VOCABULARIES[lr_field], dtype=object)
+        if lr_field in STYLE_FIELDS:
+            picks = rng.integers(0, len(vocabulary), size=styles.count)
+            return per_style(vocabulary[picks])
+        return vocabulary[rng.integers(0, len(vocabulary), size=rows)]
+    if lr_field == "Color Grouping Code":
+        return _style_codes("ST", styles).astype(object)
+    if lr_field == "Vendor Style Code":
+        codes = np.char.add(_style_codes("V", styles), "-")
+        return np.char.add(codes, styles.sizes).astype(object)
+    if lr_field == "Size":
+        return styles.sizes.astype(object)
+    if lr_field == "MRP":
+        return per_style(styles.mrp)
+    if lr_field == "Selling Price":
+        return per_style(styles.selling_price)
+    if lr_field == "Product Details":
+        return per_style(_style_descriptions(rng, styles.count))
+    if lr_field.startswith("Image URL"):
+        n = lr_field.rsplit(" ", 1)[1]
+        base = _style_codes(f"https://img.example.com/{marketplace}/", styles)
+        return np.char.add(base, f"-{n}.jpg").astype(object)
+    if lr_field == "GTIN":
+        return (8_900_000_000_000 + np.arange(rows)).astype(str).astype(object)
+    if lr_field == "Item Weight (kgs)":
+        return per_style(np.round(rng.uniform(0.1, 1.5, size=styles.count), 2))
+    if lr_field.startswith("Packed "):
+        numbers = rng.integers(2, 40, size=styles.count).astype(str)
+        suffixes = np.array(UNIT_SUFFIXES.get(marketplace, ("",)))
+        picks = rng.integers(0, len(suffixes), size=styles.count)
+        return per_style(np.char.add(numbers, suffixes[picks]))
+    return None
+
+
+def generate_catalog(
+    marketplace: str,
+    rows: int,
+    mapping_dict: dict,
+    extra_columns: int = 40,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    A `rows`-row catalog for `marketplace`, with every column mapping.json expects
+    for it followed by `extra_columns` unmapped attribute columns, all as strings.
+    """
+    if marketplace not in MARKETPLACES:
+        raise ValueError(f"Unknown marketplace: {marketplace}")
+    styles = _styles(np.random.default_rng(seed), rows)
+    catalog = {}
+    for column, lr_field in marketplace_columns(mapping_dict, marketplace).items():
+        # One generator per column, so adding a column doesn't change the others
+        field_rng = np.random.default_rng([seed, len(catalog) + 1])
+        values = _field_values(field_rng, lr_field, marketplace, styles)
+        if values is None:
+            values = np.full(rows, None, dtype=object)
+        elif lr_field not in REQUIRED_FIELDS:
+            # Style-level fields are filled in (or not) for every size of the style
+            per_sku = lr_field in ("Stock / Inventory", "GTIN")
+            values = _with_blanks(
+                field_rng, values, BLANK_SHARE, None if per_sku else styles.ids
+            )
+        catalog[column] = values
+    for n in range(extra_columns):
+        field_rng = np.random.default_rng([seed, len(catalog) + 1])
+        vocabulary = np.array([f"Value {n}.{i}" for i in range(2 + n % 12)], dtype=object)
+        catalog[f"Attribute {n + 1}"] = _with_blanks(
+            field_rng, vocabulary[field_rng.integers(0, len(vocabulary), size=rows)], 0.5
+        )
+    return pd.DataFrame(catalog)
+
+
+def write_catalog(df: pd.DataFrame, path: str):
+    """
+    Writes a generated catalog as CSV, or as XLSX with openpyxl's write-only mode.
+    """
+    if is_csv(path):
+        df.to_csv(path, index=False)
+        return
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(list(df.columns))
+    for row in df.itertuples(index=False, name=None):
+        sheet.append(row)
+    workbook.save(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--marketplace", choices=MARKETPLACES, default="myntra")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument(
+        "--extra-columns", type=int, default=40, help="Unmapped attribute columns to add"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", required=True, help="A .csv or .xlsx path")
+    args = parser.parse_args()
+
+    mapping_dict = load_mapping(os.path.join(SCRIPTS_DIR, "mapping.json"))
+    df = generate_catalog(
+        args.marketplace, args.rows, mapping_dict, args.extra_columns, args.seed
+    )
+    write_catalog(df, args.output)
+    print(f"wrote {df.shape[0]} rows x {df.shape[1]} columns to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Headless batch conversion of marketplace catalogs to LR's format.
+
+Shares the mapping and transform core with the Streamlit app but never imports
+Streamlit, so it starts quickly enough to run from cron/Airflow:
+
+    python cli.py convert --marketplace myntra in/*.csv -o out/
+    python cli.py convert --marketplace ajio in/ -o out/ --header-row 3
+    python cli.py convert in/ -o out/    # marketplace detected per file
+    python cli.py convert -m myntra in/ -o out/ --delta-dir snapshots/ --seller acme
+    python cli.py convert -m myntra in/ -o out/ --log-stages --profile run.prof.txt
+"""
+
+import argparse
+import glob
+import os
+import shutil
+import sys
+
+from converter import DEFAULT_CHUNK_ROWS, convert_file, describe_result
+from delta import SnapshotStore
+from header_matching import describe_suggestions
+from mapping_core import MARKETPLACES, compile_plan, load_mapping, load_rules
+from marketplace_detection import MarketplaceIndex, describe_detection
+from profiling import log_stages, profiled
+from readers import ExcelOptions, read_header
+from validation import describe_errors
+from writers import OUTPUT_FORMATS, output_file_name
+
+DEFAULT_MAPPING_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "mapping.json"
+)
+CATALOG_EXTENSIONS = (".csv", ".xlsx")
+
+
+def collect_inputs(paths: list) -> list:
+    """
+    Expands directories into the catalog files they contain, keeping the given order.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(
+                sorted(
+                    name
+                    for name in glob.glob(os.path.join(path, "*"))
+                    if name.endswith(CATALOG_EXTENSIONS)
+                )
+            )
+        else:
+            files.append(path)
+    return files
+
+
+def output_name(input_path: str, output_format: str) -> str:
+    file_name = os.path.basename(input_path)
+    if not file_name.endswith(".csv"):
+        # Excel inputs keep their extension in the name so x.csv and x.xlsx don't collide
+        file_name += ".csv"
+    return output_file_name(file_name, output_format)
+
+
+def run_convert(args) -> int:
+    mapping = load_mapping(args.mapping)
+    rules = load_rules(args.mapping)
+    plans = {
+        marketplace: compile_plan(mapping, marketplace, rules)
+        for marketplace in MARKETPLACES
+    }
+    marketplace_index = MarketplaceIndex(mapping)
+    snapshots = SnapshotStore(args.delta_dir) if args.delta_dir else None
+    excel_options = ExcelOptions(
+        sheet_name=args.sheet if args.sheet is not None else 0,
+        header_row=args.header_row - 1,
+    )
+    inputs = collect_inputs(args.inputs)
+    if not inputs:
+        print("No CSV/XLSX catalogs found.", file=sys.stderr)
+        return 1
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    with profiled(args.profile is not None) as profile_report:
+        failures = convert_inputs(
+            args, inputs, plans, marketplace_index, snapshots, excel_options
+        )
+    if profile_report:
+        with open(args.profile, "w", encoding="utf-8") as f:
+            f.write(profile_report[0])
+    return 1 if failures else 0
+
+
+def convert_inputs(
+    args, inputs: list, plans: dict, marketplace_index, snapshots, excel_options
+) -> int:
+    """
+    Converts each input in turn, reporting problems on stderr. Returns the number
+    of files that failed.
+    """
+    failures = 0
+    for path in inputs:
+        file_name = os.path.basename(path)
+        try:
+            with open(path, "rb") as uploaded_file:
+                marketplace = args.marketplace
+                if marketplace is None:
+                    detection = marketplace_index.detect(
+                        read_header(uploaded_file, file_name, excel_options)
+                    )
+                    if detection.ambiguous:
+                        failures += 1
+                        print(
+                            f"{file_name}: could not detect the marketplace "
+                            f"({describe_detection(detection)}); pass --marketplace",
+                            file=sys.stderr,
+                        )
+                        continue
+                    marketplace = detection.marketplace
+                result = convert_file(
+                    uploaded_file,
+                    file_name,
+                    plans[marketplace],
+                    proceed_anyway=args.proceed_anyway,
+                    excel_options=excel_options,
+                    chunksize=args.chunk_rows,
+                    output_format=args.format,
+                    arrow_strings=args.arrow_strings,
+                    previous_snapshot=(
+                        snapshots.load(args.seller, marketplace, file_name)
+                        if snapshots
+                        else None
+                    ),
+                    validate=args.validate,
+                )
+            if result.missing_headers:
+                print(
+                    f"{file_name}: missing expected headers: "
+                    + ", ".join(result.missing_headers),
+                    file=sys.stderr,
+                )
+            if result.suggestions:
+                print(
+                    f"{file_name}: possible matches:\n"
+                    + describe_suggestions(result.suggestions),
+                    file=sys.stderr,
+                )
+            if args.log_stages and result.stages:
+                log_stages(
+                    file_name,
+                    result.stages,
+                    marketplace=marketplace,
+                    rows=result.rows,
+                    rejected=result.rejected,
+                )
+            if result.rejected:
+                failures += 1
+                continue
+            destination = os.path.join(args.output_dir, output_name(path, args.format))
+            with result.output, open(destination, "wb") as f:
+                shutil.copyfileobj(result.output, f)
+            if snapshots:
+                # Only once the delta is safely written, so a failed run can be retried
+                snapshots.save(args.seller, marketplace, file_name, result.snapshot)
+            if result.invalid_rows:
+                rejected_path = os.path.join(
+                    args.output_dir, output_name(f"rejected_{file_name}", args.format)
+                )
+                errors_path = os.path.join(
+                    args.output_dir, f"LR_errors_{os.path.splitext(file_name)[0]}.csv"
+                )
+                with result.invalid_output, open(rejected_path, "wb") as f:
+                    shutil.copyfileobj(result.invalid_output, f)
+                result.errors.to_csv(errors_path, index=False)
+                print(
+                    f"{file_name}: {result.invalid_rows} rows failed validation "
+                    f"({describe_errors(result.errors)}) -> {rejected_path}, {errors_path}",
+                    file=sys.stderr,
+                )
+            elif result.invalid_output is not None:
+                result.invalid_output.close()
+            print(f"{describe_result(result)} -> {destination}")
+        except Exception as e:
+            failures += 1
+            print(f"Failed to process {file_name}: {e}", file=sys.stderr)
+    return failures
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="lr-catalog-map", description="Convert marketplace catalogs to LR's format."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert = commands.add_parser("convert", help="Convert catalog files or directories")
+    convert.add_argument("inputs", nargs="+", help="CSV/XLSX files or directories")
+    convert.add_argument(
+        "-m",
+        "--marketplace",
+        choices=MARKETPLACES,
+        help="Marketplace of every input (default: detect it from each file's headers)",
+    )
+    convert.add_argument("-o", "--output-dir", required=True)
+    convert.add_argument("--mapping", default=DEFAULT_MAPPING_FILE)
+    convert.add_argument("--format", default="csv", choices=list(OUTPUT_FORMATS))
+    convert.add_argument(
+        "--proceed-anyway",
+        action="store_true",
+        help="Convert files even if some expected headers are missing",
+    )
+    convert.add_argument(
+        "--chunk-rows",
+        type=int,
+        help=f"Stream CSV files in chunks of this many rows (e.g. {DEFAULT_CHUNK_ROWS})",
+    )
+    convert.add_argument(
+        "--arrow-strings",
+        action="store_true",
+        help="Parse into Arrow-backed string columns to cut memory use",
+    )
+    convert.add_argument(
+        "--validate",
+        action="store_true",
+        help="Move rows failing validation to LR_rejected_* and list why in LR_errors_*.csv",
+    )
+    convert.add_argument(
+        "--delta-dir",
+        help="Write only rows added/changed/removed since the last run, keeping "
+        "per-file snapshots in this directory",
+    )
+    convert.add_argument(
+        "--seller",
+        help="Seller/account ID the snapshots belong to (required with --delta-dir)",
+    )
+    convert.add_argument(
+        "--log-stages",
+        action="store_true",
+        help="Log per-stage timings of each file as JSON lines on stderr",
+    )
+    convert.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="Profile the run (pyinstrument if installed, else cProfile) and write "
+        "the report to PATH",
+    )
+    convert.add_argument("--sheet", help="Excel sheet name (default: first sheet)")
+    convert.add_argument(
+        "--header-row", type=int, default=1, help="Excel header row number (1-based)"
+    )
+    convert.set_defaults(func=run_convert)
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, "delta_dir", None) and not (args.seller or "").strip():
+        parser.error("--delta-dir needs --seller, so sellers never share snapshots")
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,385 @@
+import io
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import NamedTuple
+
+import pandas as pd
+
+from delta import CHANGE_COLUMN, DeltaTracker, describe_delta
+from layout_cache import LAYOUT_CACHE
+from mapping_core import ColumnPlan, transform_catalog
+from profiling import StageTimer
+from readers import (
+    ExcelOptions,
+    is_csv,
+    read_catalog,
+    read_csv_chunks,
+    read_header,
+)
+from validation import RowValidator
+from writers import ChunkedWriter, write_output
+
+# Rows per chunk in streaming mode; memory use scales with this, not the file size
+DEFAULT_CHUNK_ROWS = 50_000
+# Streamed output stays in memory up to this size, then rolls over to a temp file
+SPOOL_MAX_BYTES = 32 * 1024 * 1024
+COPY_CHUNK_BYTES = 1024 * 1024
+
+
+def stream_convert_csv(
+    uploaded_file,
+    plan: ColumnPlan,
+    chunksize: int = DEFAULT_CHUNK_ROWS,
+    spool_max_bytes: int = SPOOL_MAX_BYTES,
+    output_format: str = "csv",
+    arrow_strings: bool = False,
+    delta: DeltaTracker = None,
+    validator: RowValidator = None,
+    timer: StageTimer = None,
+):
+    """
+    Converts a CSV upload chunk by chunk, appending each transformed chunk to a
+    spooled temp file so peak memory is bounded by the chunk size.
+    A `validator` diverts rows failing validation to its own sink.
+    With a `delta` tracker only added/changed/removed rows are written.
+    Stage timings, summed over chunks, are recorded on `timer` when given.
+    Returns (rewound output file, number of rows written).
+    """
+    timer = timer or StageTimer()
+    output = tempfile.SpooledTemporaryFile(max_size=spool_max_bytes)
+    columns = plan.lr_fields if delta is None else plan.lr_fields + [CHANGE_COLUMN]
+    writer = ChunkedWriter(output, output_format, columns)
+    rows = 0
+    chunks = read_csv_chunks(
+        uploaded_file, chunksize, usecols=plan.used_columns, arrow_strings=arrow_strings
+    )
+    for chunk in timer.iterate("parse", chunks):
+        with timer.stage("transform") as stage:
+            transformed_chunk, _ = transform_catalog(chunk, plan)
+            stage.rows = len(chunk)
+        if validator is not None:
+            with timer.stage("validate") as stage:
+                stage.rows = len(transformed_chunk)
+                transformed_chunk, rejected = validator.split(transformed_chunk)
+        if delta is not None:
+            with timer.stage("delta") as stage:
+                stage.rows = len(transformed_chunk)
+                if validator is not None:
+                    delta.exclude(rejected)
+                transformed_chunk = delta.diff(transformed_chunk)
+        with timer.stage("write") as stage:
+            writer.write(transformed_chunk)
+            stage.rows = len(transformed_chunk)
+        rows += len(transformed_chunk)
+    if delta is not None:
+        with timer.stage("delta"):
+            removed = delta.removed(plan.lr_fields)
+        if len(removed):
+            with timer.stage("write") as stage:
+                writer.write(removed)
+                stage.rows = len(removed)
+            rows += len(removed)
+    with timer.stage("write"):
+        writer.close()
+    output.seek(0)
+    return output, rows
+
+
+class ConversionResult(NamedTuple):
+    """
+    Outcome of converting one file. `output` is the rewound LR file object, or
+    None when the file was rejected for missing headers. `parse_seconds` is None
+    for streamed files, where parsing is interleaved with transforming, and for
+    `cached` results served from the conversion cache. `suggestions` maps missing
+    headers to likely matches among the file's actual headers. In delta mode
+    `snapshot` is the row-hash index to store for the next run and `changes`
+    counts the added/changed/removed rows that make up `output`. With validation,
+    `output` holds the clean rows only, `invalid_output` the rejected ones and
+    `errors` the (row, field, rule) error table. `stages` holds a
+    profiling.StageTiming per pipeline stage.
+    """
+
+    file_name: str
+    output: object
+    rows: int
+    missing_headers: list
+    parse_seconds: float
+    total_seconds: float
+    streamed: bool
+    cached: bool = False
+    suggestions: dict = None
+    snapshot: object = None
+    changes: dict = None
+    invalid_output: object = None
+    invalid_rows: int = 0
+    errors: object = None
+    stages: tuple = None
+
+    @property
+    def rejected(self) -> bool:
+        return self.output is None
+
+    @property
+    def parse_rss_mb(self) -> float:
+        """
+        How far RSS rose while parsing this file (per chunk when streamed), as
+        sampled by the parse stage; None where it was not measured.
+        """
+        for timing in self.stages or ():
+            if timing.stage == "parse":
+                return timing.peak_rss_delta_mb
+        return None
+
+
+def convert_file(
+    uploaded_file,
+    file_name: str,
+    plan: ColumnPlan,
+    proceed_anyway: bool = False,
+    excel_options: ExcelOptions = ExcelOptions(),
+    chunksize: int = None,
+    reader=None,
+    output_format: str = "csv",
+    arrow_strings: bool = False,
+    categorize: bool = False,
+    previous_snapshot=None,
+    validate: bool = False,
+    spool_max_bytes: int = SPOOL_MAX_BYTES,
+) -> ConversionResult:
+    """
+    Converts one CSV/XLSX catalog to LR's CSV format.
+    The header row is validated first so bad files are rejected before parsing;
+    the result is cached per template layout in layout_cache.LAYOUT_CACHE.
+    CSV files are streamed in chunks when `chunksize` is given.
+    `output_format` is one of writers.OUTPUT_FORMATS. With `arrow_strings` the
+    catalog is parsed into Arrow-backed string columns, which pass through the
+    transform and into Parquet/Arrow output without a round trip via Python objects.
+    `categorize` stores low-cardinality fields of the in-memory frame as category.
+    `reader(uploaded_file, file_name)` replaces the default parse, e.g. to serve
+    frames from a cache; it must return at least the plan's used columns.
+    Passing `previous_snapshot` (delta.empty_snapshot() for a first upload) turns
+    on delta mode: only rows added, changed or removed since then are written.
+    `validate` runs validation.CHECKS on the converted rows and splits off the
+    failing ones; deltas are then computed over the clean rows, and rejected rows
+    count as neither changed nor removed.
+    """
+    start = time.perf_counter()
+    timer = StageTimer()
+    with timer.stage("header"):
+        resolution = LAYOUT_CACHE.resolve(
+            read_header(uploaded_file, file_name, excel_options), plan
+        )
+    missing, suggestions = resolution.missing_headers, resolution.suggestions
+    if missing and not proceed_anyway:
+        return ConversionResult(
+            file_name,
+            None,
+            0,
+            missing,
+            None,
+            time.perf_counter() - start,
+            False,
+            suggestions=suggestions,
+            stages=timer.stages,
+        )
+
+    delta = DeltaTracker(previous_snapshot) if previous_snapshot is not None else None
+    validator = None
+    if validate:
+        validator = RowValidator(
+            tempfile.SpooledTemporaryFile(max_size=spool_max_bytes),
+            output_format,
+            plan.lr_fields,
+        )
+    streamed = bool(chunksize) and is_csv(file_name)
+    parse_seconds = None
+    if streamed:
+        output, rows = stream_convert_csv(
+            uploaded_file,
+            plan,
+            chunksize=chunksize,
+            spool_max_bytes=spool_max_bytes,
+            output_format=output_format,
+            arrow_strings=arrow_strings,
+            delta=delta,
+            validator=validator,
+            timer=timer,
+        )
+    else:
+        parse_start = time.perf_counter()
+        with timer.stage("parse") as stage:
+            if reader is not None:
+                df = reader(uploaded_file, file_name)
+            else:
+                df = read_catalog(
+                    uploaded_file,
+                    file_name,
+                    usecols=plan.used_columns,
+                    excel_options=excel_options,
+                    arrow_strings=arrow_strings,
+                )
+            stage.rows = len(df)
+        parse_seconds = time.perf_counter() - parse_start
+        with timer.stage("transform") as stage:
+            transformed_df, _ = transform_catalog(df, plan, categorize=categorize)
+            stage.rows = len(df)
+        if validator is not None:
+            with timer.stage("validate") as stage:
+                stage.rows = len(transformed_df)
+                transformed_df, rejected = validator.split(transformed_df)
+        if delta is not None:
+            with timer.stage("delta") as stage:
+                stage.rows = len(transformed_df)
+                if validator is not None:
+                    delta.exclude(rejected)
+                changed = delta.diff(transformed_df)
+                removed = delta.removed(plan.lr_fields)
+                if len(removed):
+                    # Object columns on both sides: removed rows are all-NA but for the key
+                    changed = pd.concat(
+                        [changed.astype(object), removed.astype(object)],
+                        ignore_index=True,
+                    )
+                transformed_df = changed
+        with timer.stage("write") as stage:
+            output = write_output(transformed_df, output_format)
+            stage.rows = rows = len(transformed_df)
+    if validator is not None:
+        with timer.stage("validate"):
+            validator.close()
+    return ConversionResult(
+        file_name,
+        output,
+        rows,
+        missing,
+        parse_seconds,
+        time.perf_counter() - start,
+        streamed,
+        suggestions=suggestions,
+        snapshot=delta.snapshot() if delta is not None else None,
+        changes=delta.counts if delta is not None else None,
+        invalid_output=validator.sink if validator is not None else None,
+        invalid_rows=validator.invalid_count if validator is not None else 0,
+        errors=validator.errors if validator is not None else None,
+        stages=timer.stages,
+    )
+
+
+def describe_result(result: ConversionResult) -> str:
+    """
+    One-line summary of a successful conversion for logs and the UI.
+    """
+    if result.cached:
+        return f"{result.file_name}: {result.rows} rows served from cache"
+    if result.streamed:
+        summary = f"{result.file_name}: streamed {result.rows} rows"
+    else:
+        summary = (
+            f"{result.file_name}: parsed {result.rows} rows in "
+            f"{result.parse_seconds:.2f}s"
+        )
+    summary += f", converted in {result.total_seconds:.2f}s"
+    if result.parse_rss_mb is not None:
+        summary += f", parse RSS +{result.parse_rss_mb:.1f} MB"
+    if result.changes is not None:
+        summary += f" (delta: {describe_delta(result.changes)})"
+    if result.errors is not None:
+        summary += f"; {result.invalid_rows} rows failed validation"
+    return summary
+
+
+class SpilledOutput(io.FileIO):
+    """
+    An output file a pool worker left in the spill directory, opened for reading
+    in the parent process. The file is deleted once this is closed.
+    """
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            try:
+                os.remove(self.name)
+            except OSError:
+                pass
+
+
+def convert_bytes(
+    data: bytes, file_name: str, plan: ColumnPlan, spill_dir: str = None, **options
+):
+    """
+    Process-pool entry point: converts an in-memory upload and writes its outputs
+    to temp files in `spill_dir`, returning their paths in place of the file
+    objects so the result pickles back to the parent without the data itself.
+    """
+    result = convert_file(io.BytesIO(data), file_name, plan, **options)
+    for field in ("output", "invalid_output"):
+        output = getattr(result, field)
+        if output is not None:
+            with output, tempfile.NamedTemporaryFile(
+                dir=spill_dir, prefix="lr-output-", delete=False
+            ) as f:
+                shutil.copyfileobj(output, f, COPY_CHUNK_BYTES)
+            result = result._replace(**{field: f.name})
+    return result
+
+
+def _open_spilled(result: ConversionResult) -> ConversionResult:
+    # The parent side of convert_bytes: reopens the outputs a worker wrote
+    for field in ("output", "invalid_output"):
+        path = getattr(result, field)
+        if path is not None:
+            result = result._replace(**{field: SpilledOutput(path, "rb")})
+    return result
+
+
+def _job_options(options: dict, job_options: list) -> dict:
+    return dict(options, **job_options[0]) if job_options else options
+
+
+def convert_many(
+    jobs: list, max_workers: int = 1, spill_dir: str = None, **options
+):
+    """
+    Converts (data, file_name, plan) jobs, yielding (job index, result, error) as
+    each one finishes. A job may carry a fourth item, a dict of options for that
+    file only (e.g. its previous_snapshot), merged over `options`. With more than
+    one worker the jobs run in a process pool; "spawn" is used because forking the
+    threaded Streamlit server is unsafe. Pool workers hand outputs back as temp
+    files in `spill_dir` (SpilledOutput), so no output is held whole in memory.
+    """
+    if max_workers <= 1 or len(jobs) <= 1:
+        for idx, (data, file_name, plan, *job_options) in enumerate(jobs):
+            try:
+                file_options = _job_options(options, job_options)
+                yield idx, convert_file(
+                    io.BytesIO(data), file_name, plan, **file_options
+                ), None
+            except Exception as e:
+                yield idx, None, e
+        return
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=min(max_workers, len(jobs)), mp_context=context
+    ) as executor:
+        futures = {
+            executor.submit(
+                convert_bytes,
+                data,
+                file_name,
+                plan,
+                spill_dir=spill_dir,
+                **_job_options(options, job_options),
+            ): idx
+            for idx, (data, file_name, plan, *job_options) in enumerate(jobs)
+        }
+        for future in as_completed(futures):
+            try:
+                yield futures[future], _open_spilled(future.result()), None
+            except Exception as e:
+                yield futures[future], None, e
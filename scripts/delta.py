@@ -0,0 +1,179 @@
+import os
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# LR field identifying a row across uploads (the seller's SKU code)
+DELTA_KEY = "Vendor Style Code"
+# Extra output column telling downstream sync what happened to each row
+CHANGE_COLUMN = "Change Type"
+ADDED, CHANGED, REMOVED = "added", "changed", "removed"
+
+# Where snapshots live unless LR_MAPPER_SNAPSHOT_DIR says otherwise (gitignored)
+DEFAULT_SNAPSHOT_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "snapshots"
+)
+
+_UNSAFE_NAME = re.compile(r"[^0-9A-Za-z._-]+")
+
+
+def empty_snapshot() -> pd.Series:
+    return pd.Series([], index=pd.Index([], dtype=object, name=DELTA_KEY), dtype="uint64")
+
+
+def row_hashes(transformed_df: pd.DataFrame) -> np.ndarray:
+    """
+    64-bit hash of every row's LR fields. Columns are hashed as objects so the
+    same values hash the same whether they were parsed as category, Arrow
+    strings or plain objects.
+    """
+    return pd.util.hash_pandas_object(
+        transformed_df.astype(object), index=False
+    ).to_numpy()
+
+
+class DeltaTracker:
+    """
+    Compares transformed rows against the previous run's snapshot (row hash per
+    key). Feed it the whole frame or successive chunks with `diff`, then call
+    `removed` and `snapshot` once at the end.
+    Rows without a key cannot be matched between runs and are always "added".
+    Rows held back from the output (e.g. rejected by validation) are passed to
+    `exclude` instead: their keys are not reported removed and keep their
+    previous hash in the snapshot.
+    """
+
+    def __init__(self, previous: pd.Series = None, key: str = DELTA_KEY):
+        self.previous = previous if previous is not None else empty_snapshot()
+        self.key = key
+        self.counts = dict.fromkeys((ADDED, CHANGED, REMOVED), 0)
+        self._keys = []
+        self._hashes = []
+        self._excluded = []
+
+    def diff(self, transformed_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Returns the added and changed rows of `transformed_df` with CHANGE_COLUMN set.
+        """
+        if self.key not in transformed_df.columns:
+            raise ValueError(f"Delta mode needs the {self.key!r} field in the mapping")
+        keys = transformed_df[self.key].astype(object)
+        has_key = keys.notna().to_numpy()
+        hashes = row_hashes(transformed_df)
+        self._keys.append(keys.to_numpy()[has_key])
+        self._hashes.append(hashes[has_key])
+
+        positions = self.previous.index.get_indexer(keys)
+        known = positions >= 0
+        changed = np.zeros(len(keys), dtype=bool)
+        changed[known] = self.previous.to_numpy()[positions[known]] != hashes[known]
+        added = ~known
+        self.counts[ADDED] += int(added.sum())
+        self.counts[CHANGED] += int(changed.sum())
+
+        delta = transformed_df[added | changed].copy()
+        delta[CHANGE_COLUMN] = np.where(added[added | changed], ADDED, CHANGED)
+        return delta
+
+    def exclude(self, held_back_df: pd.DataFrame):
+        """
+        Records rows left out of this run's output so their keys keep the state
+        of the previous snapshot.
+        """
+        if len(held_back_df) and self.key in held_back_df.columns:
+            keys = held_back_df[self.key].astype(object)
+            self._excluded.append(keys[keys.notna()].to_numpy())
+
+    def snapshot(self) -> pd.Series:
+        """
+        Row hash per key for everything seen so far; the last row wins for repeated
+        keys. Excluded keys not seen otherwise keep their previous hash.
+        """
+        kept = self.previous[
+            self.previous.index.isin(self._excluded_keys())
+            & ~self.previous.index.isin(self._seen_keys())
+        ]
+        if not self._keys:
+            return kept if len(kept) else empty_snapshot()
+        snapshot = pd.Series(
+            np.concatenate(self._hashes),
+            index=pd.Index(np.concatenate(self._keys), name=self.key),
+            dtype="uint64",
+        )
+        snapshot = snapshot[~snapshot.index.duplicated(keep="last")]
+        return pd.concat([snapshot, kept]) if len(kept) else snapshot
+
+    def _seen_keys(self) -> pd.Index:
+        return pd.Index(np.concatenate(self._keys)) if self._keys else pd.Index([])
+
+    def _excluded_keys(self) -> pd.Index:
+        return pd.Index(np.concatenate(self._excluded)) if self._excluded else pd.Index([])
+
+    def removed(self, columns: list) -> pd.DataFrame:
+        """
+        Rows of the previous snapshot that are absent now: only the key is filled in.
+        """
+        seen = self._seen_keys().append(self._excluded_keys())
+        gone = self.previous.index.difference(seen)
+        self.counts[REMOVED] = len(gone)
+        removed = pd.DataFrame({self.key: gone.to_numpy()}).reindex(columns=columns)
+        removed[CHANGE_COLUMN] = REMOVED
+        return removed
+
+
+def describe_delta(counts: dict) -> str:
+    return ", ".join(f"{counts[change]} {change}" for change in (ADDED, CHANGED, REMOVED))
+
+
+class SnapshotStore:
+    """
+    Snapshot per (seller, marketplace, file name) in a directory, stored as a
+    two-column Parquet file (key, uint64 row hash): a few bytes per row instead of
+    the full previous LR output. Each seller/account gets its own subdirectory, so
+    two sellers uploading "catalog.csv" never diff against each other.
+    """
+
+    def __init__(self, directory: str = None):
+        self.directory = os.path.abspath(
+            directory or os.environ.get("LR_MAPPER_SNAPSHOT_DIR") or DEFAULT_SNAPSHOT_DIR
+        )
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, seller: str, marketplace: str, file_name: str) -> str:
+        seller_name = _UNSAFE_NAME.sub("_", seller.strip())
+        if not seller_name.strip("._"):
+            raise ValueError("Delta mode needs a seller/account ID")
+        name = _UNSAFE_NAME.sub("_", file_name)
+        return os.path.join(
+            self.directory, seller_name, f"{marketplace}-{name}.snapshot.parquet"
+        )
+
+    def load(self, seller: str, marketplace: str, file_name: str) -> pd.Series:
+        """
+        The last stored snapshot, or an empty one for a first upload.
+        """
+        path = self.path(seller, marketplace, file_name)
+        if not os.path.exists(path):
+            return empty_snapshot()
+        table = pq.read_table(path)
+        return pd.Series(
+            table.column("row_hash").to_numpy(),
+            index=pd.Index(table.column("key").to_pylist(), dtype=object, name=DELTA_KEY),
+            dtype="uint64",
+        )
+
+    def save(self, seller: str, marketplace: str, file_name: str, snapshot: pd.Series):
+        table = pa.table(
+            {
+                "key": pa.array(snapshot.index.astype(str), pa.string()),
+                "row_hash": pa.array(snapshot.to_numpy(), pa.uint64()),
+            }
+        )
+        # Write then rename so a crash never leaves a truncated snapshot behind
+        path = self.path(seller, marketplace, file_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        pq.write_table(table, path + ".tmp", compression="zstd")
+        os.replace(path + ".tmp", path)
@@ -0,0 +1,104 @@
+import re
+import warnings
+from collections import Counter
+
+try:
+    from rapidfuzz import fuzz
+except ImportError:
+    with warnings.catch_warnings():
+        # Without python-Levenshtein fuzzywuzzy warns on import; it still works
+        warnings.simplefilter("ignore")
+        from fuzzywuzzy import fuzz
+
+# Suggestions scoring below this (0-100) are not offered
+MIN_SCORE = 75
+# Headers sharing the most trigrams with a missing field are scored; the rest are skipped
+CANDIDATE_LIMIT = 20
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_header(name: str) -> str:
+    """
+    Lowercases and replaces punctuation (including Ajio's leading "*") with spaces,
+    so "*Brand", "brand" and "Brand_" all normalize to "brand".
+    """
+    return " ".join(_NON_ALNUM.sub(" ", str(name).lower()).split())
+
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a: str, b: str) -> int:
+    """
+    0-100 score for two normalized headers. token_set_ratio alone rates any subset
+    as 100 ("fit" vs "to fit bust inches"), so it is averaged with plain ratio.
+    """
+    return round((fuzz.ratio(a, b) + fuzz.token_set_ratio(a, b)) / 2)
+
+
+class HeaderIndex:
+    """
+    Trigram index over a file's headers. Each lookup scores only the shortlist of
+    headers that share the most trigrams with the query, which keeps matching fast
+    on templates with hundreds of columns.
+    """
+
+    def __init__(self, headers):
+        self.headers = list(headers)
+        self.normalized = [normalize_header(header) for header in self.headers]
+        self.exact = {}
+        self.postings = {}
+        for i, normalized in enumerate(self.normalized):
+            self.exact.setdefault(normalized, i)
+            for gram in _trigrams(normalized):
+                self.postings.setdefault(gram, []).append(i)
+
+    def candidates(self, normalized: str, limit: int = CANDIDATE_LIMIT) -> list:
+        counts = Counter()
+        for gram in _trigrams(normalized):
+            counts.update(self.postings.get(gram, ()))
+        return [i for i, _ in counts.most_common(limit)]
+
+    def best_matches(self, name: str, limit: int = 3, min_score: int = MIN_SCORE):
+        """
+        Returns up to `limit` (header, score) pairs for `name`, best first.
+        """
+        normalized = normalize_header(name)
+        if normalized in self.exact:
+            return [(self.headers[self.exact[normalized]], 100)]
+        scored = []
+        for i in self.candidates(normalized):
+            score = similarity(normalized, self.normalized[i])
+            if score >= min_score:
+                scored.append((score, i))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [(self.headers[i], score) for score, i in scored[:limit]]
+
+
+def suggest_matches(header, missing, min_score: int = MIN_SCORE) -> dict:
+    """
+    Maps each missing marketplace column to its likely matches among the file's
+    actual headers: {missing column: [(header, score), ...]}. Columns with no
+    plausible match are left out. Not memoized here: conversions go through
+    layout_cache.LAYOUT_CACHE, which keeps the result per template layout.
+    """
+    index = HeaderIndex(header)
+    suggestions = {}
+    for column in missing:
+        matches = index.best_matches(column, min_score=min_score)
+        if matches:
+            suggestions[column] = matches
+    return suggestions
+
+
+def describe_suggestions(suggestions: dict) -> str:
+    """
+    One line per missing column listing its likely matches, for logs and the UI.
+    """
+    return "\n".join(
+        f"{column} -> " + ", ".join(f"{header} ({score})" for header, score in matches)
+        for column, matches in suggestions.items()
+    )
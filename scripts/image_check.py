@@ -0,0 +1,195 @@
+import asyncio
+import threading
+import time
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+from cachetools import TTLCache
+from tornado.httpclient import AsyncHTTPClient, HTTPRequest
+
+from mapping_core import ColumnPlan
+from readers import ExcelOptions, read_catalog
+
+IMAGE_FIELDS = tuple(f"Image URL {i}" for i in range(1, 6))
+# Requests in flight at once (the client's connection pool size)
+MAX_CONNECTIONS = 32
+REQUEST_TIMEOUT_SECONDS = 10
+# Checked URLs are remembered this long, so re-uploads don't re-check every image
+IMAGE_CACHE_TTL_SECONDS = 6 * 60 * 60
+IMAGE_CACHE_ENTRIES = 500_000
+# Servers that refuse HEAD are asked for the first byte instead
+HEAD_NOT_ALLOWED = (405, 501)
+
+
+class ImageStatus(NamedTuple):
+    """
+    Outcome of checking one image URL: `status` is the HTTP status (0 when the
+    request failed before a response) and `error` the failure reason, if any.
+    """
+
+    url: str
+    ok: bool
+    status: int
+    error: str
+
+
+class ImageCheckCache:
+    """
+    Per-URL check results with a TTL, safe to share between sessions.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = IMAGE_CACHE_TTL_SECONDS,
+        max_entries: int = IMAGE_CACHE_ENTRIES,
+    ):
+        self._entries = TTLCache(maxsize=max_entries, ttl=ttl_seconds, timer=time.monotonic)
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> ImageStatus:
+        with self._lock:
+            return self._entries.get(url)
+
+    def put(self, status: ImageStatus):
+        with self._lock:
+            self._entries[status.url] = status
+
+
+def read_image_fields(
+    uploaded_file, file_name: str, plan: ColumnPlan, excel_options: ExcelOptions
+) -> pd.DataFrame:
+    """
+    Reads only the columns the plan maps to the image fields, named as LR fields.
+    Row positions match the converted catalog's.
+    """
+    pairs = [
+        (lr_field, column)
+        for lr_field, column in zip(plan.lr_fields, plan.source_columns)
+        if lr_field in IMAGE_FIELDS and column is not None
+    ]
+    if not pairs:
+        return pd.DataFrame()
+    df = read_catalog(
+        uploaded_file,
+        file_name,
+        usecols={column for _, column in pairs},
+        excel_options=excel_options,
+    )
+    images = df.reindex(columns=[column for _, column in pairs])
+    images.columns = [lr_field for lr_field, _ in pairs]
+    return images
+
+
+def unique_image_urls(transformed_df: pd.DataFrame) -> np.ndarray:
+    """
+    Distinct non-blank URLs across the image fields. Sizes of a style share their
+    images, so this is typically a small fraction of rows x fields.
+    """
+    fields = [field for field in IMAGE_FIELDS if field in transformed_df.columns]
+    if not fields:
+        return np.array([], dtype=object)
+    urls = pd.Series(
+        pd.unique(transformed_df[fields].to_numpy(dtype=object).ravel()), dtype=object
+    ).dropna()
+    return urls[urls.astype(str).str.strip() != ""].to_numpy()
+
+
+async def _check_url(client: AsyncHTTPClient, url: str, timeout: float) -> ImageStatus:
+    try:
+        response = await client.fetch(
+            HTTPRequest(url, method="HEAD", request_timeout=timeout), raise_error=False
+        )
+        if response.code in HEAD_NOT_ALLOWED:
+            response = await client.fetch(
+                HTTPRequest(url, headers={"Range": "bytes=0-0"}, request_timeout=timeout),
+                raise_error=False,
+            )
+    except Exception as e:  # invalid URL, DNS failure, refused connection...
+        return ImageStatus(url, False, 0, str(e))
+    if response.code == 599:
+        # Tornado's code for timeouts and connection errors
+        return ImageStatus(url, False, 0, str(response.error))
+    ok = 200 <= response.code < 400
+    return ImageStatus(url, ok, response.code, None if ok else response.reason)
+
+
+async def check_urls_async(
+    urls,
+    cache: ImageCheckCache,
+    max_connections: int = MAX_CONNECTIONS,
+    timeout: float = REQUEST_TIMEOUT_SECONDS,
+) -> dict:
+    """
+    Checks every URL not already cached with a HEAD request, at most
+    `max_connections` at a time, and returns {url: ImageStatus}.
+    """
+    results = {}
+    pending = []
+    for url in urls:
+        cached = cache.get(url)
+        if cached is None:
+            pending.append(url)
+        else:
+            results[url] = cached
+    if not pending:
+        return results
+
+    client = AsyncHTTPClient(force_instance=True, max_clients=max_connections)
+    # The client queues beyond max_clients too, but its queue timeout would count
+    # waiting time against each request; the semaphore keeps timeouts per request.
+    slots = asyncio.Semaphore(max_connections)
+
+    async def check(url):
+        async with slots:
+            status = await _check_url(client, url, timeout)
+        if status.status:
+            # Timeouts and connection errors may be transient, so they are not cached
+            cache.put(status)
+        results[url] = status
+
+    try:
+        await asyncio.gather(*(check(url) for url in pending))
+    finally:
+        client.close()
+    return results
+
+
+def check_urls(urls, cache: ImageCheckCache, **options) -> dict:
+    """
+    Blocking wrapper around check_urls_async for scripts and the Streamlit thread.
+    """
+    return asyncio.run(check_urls_async(urls, cache, **options))
+
+
+def broken_images(transformed_df: pd.DataFrame, results: dict) -> pd.DataFrame:
+    """
+    (row, field, url, status, error) for every image reference whose URL failed,
+    looked up per field with one vectorized map over the checked URLs.
+    """
+    failed = {url: status for url, status in results.items() if not status.ok}
+    status_by_url = {url: status.status for url, status in failed.items()}
+    error_by_url = {url: status.error for url, status in failed.items()}
+    frames = []
+    for field in IMAGE_FIELDS:
+        if field not in transformed_df.columns or not failed:
+            continue
+        urls = transformed_df[field].astype(object)
+        rows = np.flatnonzero(urls.isin(status_by_url.keys()).to_numpy())
+        if len(rows) == 0:
+            continue
+        field_urls = urls.iloc[rows]
+        frames.append(
+            pd.DataFrame(
+                {
+                    "row": rows,
+                    "field": field,
+                    "url": field_urls.to_numpy(),
+                    "status": field_urls.map(status_by_url).to_numpy(),
+                    "error": field_urls.map(error_by_url).to_numpy(),
+                }
+            )
+        )
+    if not frames:
+        return pd.DataFrame(columns=["row", "field", "url", "status", "error"])
+    return pd.concat(frames, ignore_index=True).sort_values(["row", "field"], ignore_index=True)
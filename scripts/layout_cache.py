@@ -0,0 +1,82 @@
+import hashlib
+import json
+import threading
+from typing import NamedTuple
+
+from cachetools import LRUCache
+
+from header_matching import suggest_matches
+from mapping_core import ColumnPlan, find_missing_headers
+
+# Distinct (header row, marketplace, mapping) layouts remembered per process
+LAYOUT_CACHE_ENTRIES = 1024
+
+
+class HeaderResolution(NamedTuple):
+    """
+    What the header check worked out for one template layout: the plan's columns
+    missing from the file and fuzzy suggestions for them.
+    """
+
+    missing_headers: list
+    suggestions: dict
+
+
+def layout_key(header, plan: ColumnPlan) -> str:
+    """
+    Hash of the ordered header row and the marketplace's side of the mapping, so a
+    mapping edit does not reuse a resolution made against the old columns.
+    """
+    payload = json.dumps([plan.marketplace, plan.source_columns, list(header)])
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def resolve_header(header, plan: ColumnPlan) -> HeaderResolution:
+    missing = find_missing_headers(header, plan)
+    suggestions = suggest_matches(header, missing) if missing else None
+    return HeaderResolution(missing, suggestions)
+
+
+class LayoutCache:
+    """
+    LRU cache of header resolutions keyed by template layout. Marketplaces ship a
+    few template versions, so repeat uploads skip header matching entirely.
+    Safe to share between threads; `hits` and `misses` count lookups.
+    """
+
+    def __init__(self, max_entries: int = LAYOUT_CACHE_ENTRIES):
+        self._entries = LRUCache(maxsize=max_entries)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, header, plan: ColumnPlan) -> HeaderResolution:
+        key = layout_key(header, plan)
+        with self._lock:
+            resolution = self._entries.get(key)
+            if resolution is not None:
+                self.hits += 1
+                return resolution
+            self.misses += 1
+        resolution = resolve_header(header, plan)
+        with self._lock:
+            self._entries[key] = resolution
+        return resolution
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "layouts": len(self._entries),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# Shared by every conversion in this process
+LAYOUT_CACHE = LayoutCache()
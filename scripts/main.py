@@ -1,9 +1,36 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import io
-import json
 import os
 
+from converter import DEFAULT_CHUNK_ROWS, convert_many, describe_result
+from delta import DELTA_KEY, SnapshotStore
+from header_matching import describe_suggestions
+from image_check import (
+    ImageCheckCache,
+    broken_images,
+    check_urls,
+    read_image_fields,
+    unique_image_urls,
+)
+from layout_cache import LAYOUT_CACHE
+from mapping_core import (
+    DEFAULT_MAPPING,
+    MARKETPLACES,
+    categorize_low_cardinality,
+    compile_plan,
+    mapped_columns,
+)
+from mapping_registry import MappingRegistry, mapping_from_frame, mapping_to_frame
+from marketplace_detection import Detection, MarketplaceIndex, describe_detection
+from output_store import OutputStore
+from profiling import log_stages, profiled, stage_records
+from readers import ExcelOptions, read_catalog, read_header
+from result_cache import ConversionCache, cache_key, content_digest
+from validation import describe_errors
+from writers import OUTPUT_FORMATS, output_file_name, output_mime, write_csv
+
 st.set_page_config(page_title="LR Catalog Mapper", layout="wide")
 st.markdown(
     """
@@ -19,7 +46,7 @@ st.sidebar.title("Instructions")
 st.sidebar.info(
     """
 1. Upload one or more CSV/Excel files with your marketplace catalog.
-2. For each file, select the corresponding marketplace (Myntra, Flipkart, or Ajio).
+2. The marketplace (Myntra, Flipkart, or Ajio) is detected from the headers and pre-selected for each file; change it if the detection is wrong.
 3. Check the box if you want to proceed even if some expected headers are missing.
 4. Click **Convert Files** to transform all catalogs into LR's format.
     """
@@ -31,161 +58,106 @@ st.sidebar.info(
     """
 )
 
-# Default mapping dictionary
-DEFAULT_MAPPING = {
-    "Brand Name": {"myntra": "brand", "ajio": "*Brand", "flipkart": "Brand"},
-    "Color Grouping Code": {
-        "myntra": "styleId",
-        "ajio": "*Style Code",
-        "flipkart": "Style Code",
-    },
-    "Vendor Style Code": {
-        "myntra": "vendorSkuCode",
-        "ajio": "*Item SKU",
-        "flipkart": "Seller SKU ID",
-    },
-    "Size": {"myntra": "Standard Size", "ajio": "*Size", "flipkart": "Size"},
-    "Color": {
-        "myntra": "Brand Colour (Remarks)",
-        "ajio": "*Primary Color",
-        "flipkart": "Brand Color",
-    },
-    "Material": {"myntra": "Fabric", "ajio": "*Fabric Detail", "flipkart": "Fabric"},
-    "MRP": {"myntra": "MRP", "ajio": "*MRP", "flipkart": "MRP"},
-    "Selling Price": {
-        "myntra": "Selling Price",
-        "ajio": "Selling Price",
-        "flipkart": "Selling Price",
-    },
-    "Stock / Inventory": {"myntra": "Stock Type", "ajio": "Stock Type", "flipkart": ""},
-    "Print & Pattern": {
-        "myntra": "Print or Pattern Type",
-        "ajio": "*Pattern",
-        "flipkart": "Pattern",
-    },
-    "Work": {"myntra": "Work", "ajio": "Work", "flipkart": ""},
-    "Lining Material": {
-        "myntra": "Lining Fabric",
-        "ajio": "*Lining",
-        "flipkart": "Lining Material",
-    },
-    "Sleeve Type": {
-        "myntra": "Sleeve Styling",
-        "ajio": "Sleeve Type",
-        "flipkart": "Sleeve Style",
-    },
-    "Neck Type": {"myntra": "Neck", "ajio": "*Neckline", "flipkart": "Neck"},
-    "Type": {"myntra": "Dress Shape", "ajio": "*Style Type", "flipkart": "Dress Type"},
-    "Packed Width (inches)": {
-        "myntra": "",
-        "ajio": "*articleDimensionsUnitWidth",
-        "flipkart": "packageDimensionsWidth",
-    },
-    "Packed Height (inches)": {
-        "myntra": "",
-        "ajio": "*articleDimensionsUnitHeight",
-        "flipkart": "packageDimensionsHeight",
-    },
-    "Item Weight (kgs)": {
-        "myntra": "",
-        "ajio": "*articleDimensionsUnitWeight",
-        "flipkart": "packageDimensionsWeight",
-    },
-    "Packed Length (inches)": {
-        "myntra": "",
-        "ajio": "*articleDimensionsUnitLength",
-        "flipkart": "packageDimensionsLength",
-    },
-    "Pockets": {
-        "myntra": "Number of Pockets",
-        "ajio": "Number of Pockets",
-        "flipkart": "",
-    },
-    "Care": {"myntra": "Wash Care", "ajio": "Care", "flipkart": "Fabric Care"},
-    "Product Details": {
-        "myntra": "Product Details",
-        "ajio": "*Product Name",
-        "flipkart": "Description",
-    },
-    "Image URL 1": {
-        "myntra": "Front Image",
-        "ajio": "*Main Image URL",
-        "flipkart": "Main Image URL",
-    },
-    "Image URL 2": {
-        "myntra": "Side Image",
-        "ajio": "Other Image URL 1",
-        "flipkart": "Other Image URL 1",
-    },
-    "Image URL 3": {
-        "myntra": "Back Image",
-        "ajio": "Other Image URL 2",
-        "flipkart": "Other Image URL 2",
-    },
-    "Image URL 4": {
-        "myntra": "Detail Angle",
-        "ajio": "Other Image URL 3",
-        "flipkart": "Other Image URL 3",
-    },
-    "Image URL 5": {
-        "myntra": "Look Shot Image",
-        "ajio": "Other Image URL 4",
-        "flipkart": "Other Image URL 4",
-    },
-    "Transparency of Fabric": {
-        "myntra": "Transparency",
-        "ajio": "Transparency",
-        "flipkart": "",
-    },
-    "Color Family": {
-        "myntra": "Prominent Colour",
-        "ajio": "*Color Family",
-        "flipkart": "Color",
-    },
-    "Occasion": {"myntra": "Occasion", "ajio": "*Occasion", "flipkart": "Occasion"},
-    "GST Rate": {"myntra": "", "ajio": "", "flipkart": ""},
-    "HSN Code": {"myntra": "HSN", "ajio": "*HSN", "flipkart": "EAN/UPC"},
-    "Closure": {"myntra": "Closure", "ajio": "Closure", "flipkart": ""},
-    "Ideal for": {"myntra": "Ideal for", "ajio": "Ideal for", "flipkart": "Ideal For"},
-    "GTIN": {"myntra": "GTIN", "ajio": "GTIN", "flipkart": "EAN/UPC"},
-    "Manufacturing Date": {"myntra": "", "ajio": "", "flipkart": ""},
-    "Country Of Origin": {
-        "myntra": "Country Of Origin",
-        "ajio": "*Country of Origin",
-        "flipkart": "Country Of Origin",
-    },
-    "Fit": {"myntra": "", "ajio": "fit", "flipkart": ""},
-    "Model Details": {"myntra": "", "ajio": "model details", "flipkart": ""},
-}
-
 mapping_file = "mapping.json"
-if os.path.exists(mapping_file):
-    with open(mapping_file, "r") as f:
-        mapping_dict = json.load(f)
-else:
+
+
+@st.cache_resource
+def get_mapping_registry() -> MappingRegistry:
+    # One registry per server process; it re-reads the file only when it changes
+    return MappingRegistry(mapping_file)
+
+
+mapping_registry = get_mapping_registry()
+try:
+    mapping_dict = mapping_registry.mapping
+    mapping_rules = mapping_registry.rules
+    mapping_df = mapping_registry.frame()
+except ValueError as e:
+    st.error(f"Could not load {mapping_file} ({e}); using the default mapping.")
     mapping_dict = DEFAULT_MAPPING.copy()
+    mapping_rules = {}
+    mapping_df = mapping_to_frame(mapping_dict)
 
+# Converted CSVs kept across reruns and sessions, keyed by upload content + mapping
+CONVERSION_CACHE_BYTES = 512 * 1024 * 1024
+CONVERSION_CACHE_DISK_BYTES = 4 * 1024 * 1024 * 1024
+# Larger outputs are not cached, so they are never read into memory whole
+CONVERSION_CACHE_ENTRY_BYTES = 64 * 1024 * 1024
 
-def transform_catalog(df: pd.DataFrame, marketplace: str) -> (pd.DataFrame, list):
-    """
-    Transforms a marketplace catalog to LR's format.
-    Returns a tuple of (transformed DataFrame, list of missing expected header names).
-    """
-    transformed_data = pd.DataFrame()
-    missing_headers = []
-
-    for lr_field, mapping in mapping_dict.items():
-        marketplace_field = mapping.get(marketplace)
-        if marketplace_field:
-            if marketplace_field in df.columns:
-                transformed_data[lr_field] = df[marketplace_field]
-            else:
-                transformed_data[lr_field] = None
-                missing_headers.append(marketplace_field)
-        else:
-            transformed_data[lr_field] = None
 
-    return transformed_data, missing_headers
+# Converted files are kept compressed per session, spilled to disk when large
+OUTPUT_SPILL_BYTES = 8 * 1024 * 1024
+OUTPUT_TTL_SECONDS = 60 * 60
+
+# Parsed upload frames kept across reruns so switching marketplace doesn't re-parse
+PARSE_CACHE_ENTRIES = 32
+PARSE_CACHE_TTL_SECONDS = 30 * 60
+
+# Error table rows shown inline; the full table is offered as a download
+ERROR_PREVIEW_ROWS = 1_000
+
+
+@st.cache_data(
+    max_entries=PARSE_CACHE_ENTRIES, ttl=PARSE_CACHE_TTL_SECONDS, show_spinner=False
+)
+def parse_upload(
+    file_id: str,
+    digest: str,
+    file_name: str,
+    excel_options: ExcelOptions,
+    usecols: tuple,
+    arrow_strings: bool,
+    categorize: bool,
+    _data: bytes,
+) -> pd.DataFrame:
+    # Keyed by upload id + content digest; the raw bytes themselves are not hashed.
+    # With `categorize`, repetitive columns are cached as category to keep the
+    # cache footprint small; the frame is only kept, so it is done here, not on
+    # the write path.
+    df = read_catalog(
+        io.BytesIO(_data),
+        file_name,
+        usecols=usecols,
+        excel_options=excel_options,
+        arrow_strings=arrow_strings,
+    )
+    return categorize_low_cardinality(df) if categorize else df
+
+
+@st.cache_data(
+    max_entries=PARSE_CACHE_ENTRIES, ttl=PARSE_CACHE_TTL_SECONDS, show_spinner=False
+)
+def detect_upload_marketplace(
+    file_id: str,
+    file_name: str,
+    excel_options: ExcelOptions,
+    mapping: dict,
+    _uploaded_file,
+) -> Detection:
+    # Only the header row is read, once per upload/sheet selection/mapping
+    header = read_header(_uploaded_file, file_name, excel_options)
+    return MarketplaceIndex(mapping).detect(header)
+
+
+@st.cache_resource
+def get_conversion_cache() -> ConversionCache:
+    return ConversionCache(
+        CONVERSION_CACHE_BYTES,
+        disk_dir=os.environ.get("LR_MAPPER_CACHE_DIR"),
+        max_disk_bytes=CONVERSION_CACHE_DISK_BYTES,
+        max_entry_bytes=CONVERSION_CACHE_ENTRY_BYTES,
+    )
+
+
+@st.cache_resource
+def get_snapshot_store() -> SnapshotStore:
+    # LR_MAPPER_SNAPSHOT_DIR, else the gitignored scripts/snapshots/
+    return SnapshotStore()
+
+
+@st.cache_resource
+def get_image_cache() -> ImageCheckCache:
+    return ImageCheckCache()
 
 
 # MAIN APP UI
@@ -194,33 +166,26 @@ st.markdown("#")
 
 # Display and edit mapping
 st.subheader("Current Field Mapping (editable)")
-mapping_df = pd.DataFrame.from_dict(mapping_dict, orient="index")
-mapping_df.reset_index(inplace=True)
-mapping_df.columns = ["limeroad", "myntra", "ajio", "flipkart"]
 edited_mapping = st.data_editor(mapping_df, num_rows="dynamic", key="mapping_editor")
 
-if not edited_mapping.empty:
-    updated_mapping = {}
-    for _, row in edited_mapping.iterrows():
-        field = row["limeroad"]
-        updated_mapping[field] = {
-            "myntra": row["myntra"] if pd.notna(row["myntra"]) else "",
-            "ajio": row["ajio"] if pd.notna(row["ajio"]) else "",
-            "flipkart": row["flipkart"] if pd.notna(row["flipkart"]) else "",
-        }
-    mapping_dict = updated_mapping
+# Only rebuild the mapping when the table was actually edited this session
+editor_state = st.session_state.get("mapping_editor", {})
+mapping_edited = not edited_mapping.empty and any(
+    editor_state.get(change) for change in ("edited_rows", "added_rows", "deleted_rows")
+)
+if mapping_edited:
+    mapping_dict = mapping_from_frame(edited_mapping)
 
 col1, col2, col3 = st.columns([1, 2, 6])
 with col1:
     if st.button("Save Mapping"):
-        with open(mapping_file, "w") as f:
-            json.dump(mapping_dict, f, indent=4)
+        mapping_registry.save(mapping_dict)
         st.success("Mapping saved successfully!")
 with col2:
     if st.button("Reset Mapping to Default"):
         mapping_dict = DEFAULT_MAPPING.copy()
-        with open(mapping_file, "w") as f:
-            json.dump(mapping_dict, f, indent=4)
+        mapping_edited = False
+        mapping_registry.reset()
         st.success("Mapping has been reset to default.")
 
 
@@ -231,64 +196,383 @@ uploaded_files = st.file_uploader(
     "Upload CSV or Excel file(s)", type=["csv", "xlsx"], accept_multiple_files=True
 )
 
+with st.expander("Excel options"):
+    excel_sheet = st.text_input("Sheet name (leave blank for the first sheet)", value="")
+    excel_header_row = st.number_input(
+        "Header row number (for templates with instruction rows above the header)",
+        min_value=1,
+        value=1,
+    )
+excel_options = ExcelOptions(
+    sheet_name=excel_sheet or 0, header_row=int(excel_header_row) - 1
+)
+
 file_marketplace = {}
 if uploaded_files:
-    st.markdown("### Select Marketplace for each file")
+    st.markdown("### Marketplace for each file")
+    marketplaces = list(MARKETPLACES)
     for uploaded_file in uploaded_files:
+        try:
+            detection = detect_upload_marketplace(
+                uploaded_file.file_id,
+                uploaded_file.name,
+                excel_options,
+                mapping_dict,
+                uploaded_file,
+            )
+        except Exception as e:
+            # The file may still convert (e.g. with other Excel options); let the user pick
+            detection = None
+            st.warning(f"Could not read the headers of {uploaded_file.name}: {e}")
+        if detection is None:
+            label = f"Marketplace for {uploaded_file.name}"
+        elif detection.ambiguous:
+            label = (
+                f"Marketplace for {uploaded_file.name} (could not detect it; "
+                f"mapped headers found: {describe_detection(detection)})"
+            )
+        else:
+            label = (
+                f"Marketplace for {uploaded_file.name} (detected "
+                f"**{detection.marketplace}**; mapped headers found: "
+                f"{describe_detection(detection)})"
+            )
+        # Always shown, pre-selected with the detected marketplace, so a wrong
+        # detection can be overridden; a new detection resets the choice
+        detected = detection.marketplace if detection is not None else None
         file_marketplace[uploaded_file.name] = st.selectbox(
-            f"Marketplace for {uploaded_file.name}",
-            ["myntra", "ajio", "flipkart"],
-            key=uploaded_file.name,
+            label,
+            marketplaces,
+            index=marketplaces.index(detected) if detected in marketplaces else 0,
+            key=f"marketplace:{uploaded_file.name}:{detected}",
         )
 
 proceed_anyway = st.checkbox(
     "Proceed even if some expected headers are missing", value=False
 )
+streaming_mode = st.checkbox(
+    "Streaming mode for large CSV files (convert in chunks to limit memory use)",
+    value=False,
+)
+chunk_rows = DEFAULT_CHUNK_ROWS
+if streaming_mode:
+    chunk_rows = st.number_input(
+        "Rows per chunk", min_value=1_000, value=DEFAULT_CHUNK_ROWS, step=10_000
+    )
+output_format = st.selectbox(
+    "Output format",
+    list(OUTPUT_FORMATS),
+    format_func={
+        "csv": "CSV",
+        "parquet": "Parquet (dictionary-encoded, compressed)",
+        "arrow": "Arrow IPC (dictionary-encoded, compressed)",
+    }.get,
+)
+arrow_strings = st.checkbox(
+    "Arrow-backed strings (lower memory use for large catalogs)", value=False
+)
+categorize_cached = st.checkbox(
+    "Keep parsed uploads as categories between reruns (smaller cache, slower "
+    "first parse)",
+    value=True,
+)
+validate_rows = st.checkbox(
+    "Validate rows (empty style code, MRP below selling price, malformed GTIN/HSN, "
+    "non-numeric package fields) and split off rejected rows",
+    value=False,
+)
+check_images = st.checkbox(
+    "Check image URLs (one HEAD request per unique image, results cached)",
+    value=False,
+)
+delta_mode = st.checkbox(
+    f"Delta mode: only output rows added, changed or removed since the last "
+    f"conversion of the same file name (keyed by {DELTA_KEY})",
+    value=False,
+)
+seller_id = ""
+if delta_mode:
+    seller_id = st.text_input(
+        "Seller / account ID (deltas are tracked separately for each seller)"
+    ).strip()
+max_workers = st.number_input(
+    "Parallel workers (files converted at the same time)",
+    min_value=1,
+    max_value=os.cpu_count() or 1,
+    value=min(4, os.cpu_count() or 1),
+)
+profile_run = st.checkbox(
+    "Profile this run (converts in-process and adds a profiler report under "
+    "Performance details)",
+    value=False,
+)
 
 if "all_outputs" not in st.session_state:
-    st.session_state["all_outputs"] = []
+    st.session_state["all_outputs"] = OutputStore(
+        OUTPUT_TTL_SECONDS,
+        spill_bytes=OUTPUT_SPILL_BYTES,
+        spill_dir=os.environ.get("LR_MAPPER_SPILL_DIR"),
+    )
+all_outputs = st.session_state["all_outputs"]
+all_outputs.expire()
 
 if st.button("Convert Files"):
-    if uploaded_files:
-        all_outputs = []
+    if delta_mode and not seller_id:
+        st.error("Please enter the seller / account ID to use delta mode.")
+    elif uploaded_files:
+        all_outputs.clear()
+        # Snapshots of this run, saved only once the user accepts the delta
+        st.session_state["pending_snapshots"] = {}
         progress_bar = st.progress(0)
         total_files = len(uploaded_files)
+        plans = {
+            marketplace: (
+                compile_plan(mapping_dict, marketplace, mapping_rules)
+                if mapping_edited
+                else mapping_registry.plan(marketplace)
+            )
+            for marketplace in set(file_marketplace.values())
+        }
+        conversion_cache = get_conversion_cache()
+        snapshots = get_snapshot_store() if delta_mode else None
+        outcomes = [None] * total_files
+        keys = []
+        jobs = []
+        job_indexes = []
         for idx, uploaded_file in enumerate(uploaded_files):
-            try:
-                if uploaded_file.name.endswith(".csv"):
-                    df = pd.read_csv(uploaded_file, dtype=str)
-                else:
-                    df = pd.read_excel(uploaded_file, dtype=str)
+            data = uploaded_file.getvalue()
+            plan = plans[file_marketplace.get(uploaded_file.name, "")]
+            key = cache_key(
+                data, uploaded_file.name, plan, excel_options, output_format
+            )
+            keys.append(key)
+            if snapshots is not None:
+                # A delta depends on the stored snapshot, so it is never served from cache
+                previous = snapshots.load(
+                    seller_id, plan.marketplace, uploaded_file.name
+                )
+                jobs.append(
+                    (data, uploaded_file.name, plan, {"previous_snapshot": previous})
+                )
+                job_indexes.append(idx)
+                continue
+            if validate_rows:
+                # The cache keeps a single output per file, not the clean/rejected split
+                jobs.append((data, uploaded_file.name, plan))
+                job_indexes.append(idx)
+                continue
+            cached = conversion_cache.get_result(key, uploaded_file.name)
+            if cached is None:
+                jobs.append((data, uploaded_file.name, plan))
+                job_indexes.append(idx)
+                continue
+            if cached.missing_headers and not proceed_anyway:
+                cached = cached._replace(output=None)
+            outcomes[idx] = (cached, None)
+
+        # The parse cache only helps in-process: pool workers parse on their own.
+        # convert_many runs a single job in-process whatever the worker count.
+        # Profiling only sees this process, so a profiled run converts in-process
+        workers = 1 if profile_run else int(max_workers)
+        reader = None
+        if workers <= 1 or len(jobs) <= 1:
+            file_ids = {f.name: f.file_id for f in uploaded_files}
+            parse_columns = tuple(sorted(mapped_columns(mapping_dict)))
 
-                marketplace = file_marketplace.get(uploaded_file.name, "")
-                transformed_df, missing = transform_catalog(df, marketplace)
+            def reader(uploaded_file, file_name):
+                data = uploaded_file.getvalue()
+                return parse_upload(
+                    file_ids[file_name],
+                    content_digest(data),
+                    file_name,
+                    excel_options,
+                    parse_columns,
+                    arrow_strings,
+                    categorize_cached,
+                    data,
+                )
 
-                if missing:
+        done = total_files - len(jobs)
+        progress_bar.progress(done / total_files)
+        conversions = convert_many(
+            jobs,
+            max_workers=workers,
+            spill_dir=os.environ.get("LR_MAPPER_SPILL_DIR"),
+            proceed_anyway=proceed_anyway,
+            excel_options=excel_options,
+            chunksize=int(chunk_rows) if streaming_mode else None,
+            reader=reader,
+            output_format=output_format,
+            arrow_strings=arrow_strings,
+            validate=validate_rows,
+        )
+        with profiled(profile_run) as profile_report:
+            for done, (job_idx, result, error) in enumerate(
+                conversions, start=done + 1
+            ):
+                idx = job_indexes[job_idx]
+                outcomes[idx] = (result, error)
+                if result is not None and result.stages:
+                    log_stages(result.file_name, result.stages, rows=result.rows)
+                if result is not None and result.snapshot is not None:
+                    marketplace = jobs[job_idx][2].marketplace
+                    st.session_state["pending_snapshots"][
+                        (seller_id, marketplace, result.file_name)
+                    ] = result.snapshot
+                elif result is not None and result.errors is None:
+                    conversion_cache.put_result(keys[idx], result)
+                progress_bar.progress(done / total_files)
+
+        # Report in upload order, whatever order the workers finished in
+        for uploaded_file, (result, error) in zip(uploaded_files, outcomes):
+            if error is not None:
+                st.error(f"Failed to process {uploaded_file.name}: {error}")
+                continue
+            if result.missing_headers:
+                st.warning(
+                    f"File {uploaded_file.name}: The following expected headers are missing: "
+                    + ", ".join(result.missing_headers)
+                )
+            if result.suggestions:
+                st.info(
+                    f"Possible matches in {uploaded_file.name} (update the mapping to use them):\n\n"
+                    + describe_suggestions(result.suggestions).replace("\n", "  \n")
+                )
+            if result.rejected:
+                st.info(
+                    "Please check your file headers or select the checkbox to proceed anyway."
+                )
+                continue
+
+            st.caption(describe_result(result))
+            with result.output:
+                all_outputs.add(
+                    uploaded_file.name,
+                    result.output,
+                    download_name=output_file_name(uploaded_file.name, output_format),
+                    mime=output_mime(output_format),
+                )
+            if result.invalid_rows:
+                st.warning(
+                    f"{result.invalid_rows} rows of {uploaded_file.name} failed validation "
+                    f"and were moved to a separate file: {describe_errors(result.errors)}"
+                )
+                st.dataframe(result.errors.head(ERROR_PREVIEW_ROWS), hide_index=True)
+                with result.invalid_output:
+                    all_outputs.add(
+                        f"{uploaded_file.name} (rejected rows)",
+                        result.invalid_output,
+                        download_name=output_file_name(
+                            f"rejected_{uploaded_file.name}", output_format
+                        ),
+                        mime=output_mime(output_format),
+                    )
+                all_outputs.add(
+                    f"{uploaded_file.name} (validation errors)",
+                    write_csv(result.errors),
+                    download_name=output_file_name(
+                        f"errors_{os.path.splitext(uploaded_file.name)[0]}.csv"
+                    ),
+                )
+            elif result.invalid_output is not None:
+                result.invalid_output.close()
+            st.success(f"Processed {uploaded_file.name}.")
+
+        if check_images:
+            image_frames = {}
+            for uploaded_file, (result, error) in zip(uploaded_files, outcomes):
+                if error is None and not result.rejected:
+                    image_frames[uploaded_file.name] = read_image_fields(
+                        io.BytesIO(uploaded_file.getvalue()),
+                        uploaded_file.name,
+                        plans[file_marketplace.get(uploaded_file.name, "")],
+                        excel_options,
+                    )
+            # Deduplicated across all files, so shared images are requested once
+            image_urls = pd.unique(
+                np.concatenate(
+                    [unique_image_urls(images) for images in image_frames.values()]
+                    or [np.array([], dtype=object)]
+                )
+            )
+            with st.spinner(f"Checking {len(image_urls)} unique image URLs..."):
+                image_results = check_urls(image_urls, get_image_cache())
+            for file_name, images in image_frames.items():
+                broken = broken_images(images, image_results)
+                if len(broken):
                     st.warning(
-                        f"File {uploaded_file.name}: The following expected headers are missing: "
-                        + ", ".join(missing)
+                        f"{file_name}: {broken['url'].nunique()} image URLs are unreachable "
+                        f"({broken['row'].nunique()} rows affected)"
                     )
-                    if not proceed_anyway:
-                        st.info(
-                            "Please check your file headers or select the checkbox to proceed anyway."
-                        )
-                        continue
-                output = io.BytesIO()
-                transformed_df.to_csv(output, index=False)
-                output.seek(0)
-                all_outputs.append((uploaded_file.name, output))
-                st.success(f"Processed {uploaded_file.name}.")
-            except Exception as e:
-                st.error(f"Failed to process {uploaded_file.name}: {e}")
-            progress_bar.progress((idx + 1) / total_files)
-        st.session_state["all_outputs"] = all_outputs
+                    st.dataframe(broken.head(ERROR_PREVIEW_ROWS), hide_index=True)
+                else:
+                    st.caption(f"{file_name}: all image URLs are reachable")
+
+        with st.expander("Performance details"):
+            stage_rows = []
+            for uploaded_file, (result, error) in zip(uploaded_files, outcomes):
+                if result is not None and result.stages:
+                    stage_rows += stage_records(uploaded_file.name, result.stages)
+            st.dataframe(pd.DataFrame(stage_rows), hide_index=True)
+            if profile_report:
+                st.download_button(
+                    "Download profile report", profile_report[0], "profile.txt", "text/plain"
+                )
+                st.code(profile_report[0][:20_000])
+
+        layout_stats = LAYOUT_CACHE.stats()
+        st.caption(
+            f"Header layouts: {layout_stats['hits']} hits, {layout_stats['misses']} misses, "
+            f"{layout_stats['layouts']} known (this server process)"
+        )
     else:
         st.info("Please upload at least one file.")
 
+pending_snapshots = st.session_state.get("pending_snapshots")
+if pending_snapshots:
+    st.markdown("### Accept Delta")
+    st.caption(
+        "Once accepted, the next delta conversion of these files compares against "
+        "this run. Until then it still compares against the last accepted one: "
+        + ", ".join(sorted(file_name for _, _, file_name in pending_snapshots))
+    )
+    if st.button("Accept delta"):
+        snapshots = get_snapshot_store()
+        for (seller, marketplace, file_name), snapshot in pending_snapshots.items():
+            snapshots.save(seller, marketplace, file_name, snapshot)
+        st.session_state["pending_snapshots"] = {}
+        st.success(f"Saved the snapshots of {len(pending_snapshots)} file(s).")
+
 # download buttons for all processed files (persisted in session state)
-if st.session_state["all_outputs"]:
+if all_outputs:
     st.markdown("### Download Transformed Files")
-    for file_name, output in st.session_state["all_outputs"]:
+    download_mode = st.radio(
+        "Download as",
+        ["Individual files", "One ZIP archive"],
+        index=1 if len(all_outputs) > 1 else 0,
+        horizontal=True,
+    )
+    if download_mode == "One ZIP archive":
+        # Only the archive is sent to the browser, not one payload per file
         st.download_button(
-            f"Download Transformed {file_name}", output, f"LR_{file_name}", "text/csv"
+            f"Download all {len(all_outputs)} files as ZIP",
+            all_outputs.zip_archive(),
+            "LR_catalogs.zip",
+            "application/zip",
+        )
+    else:
+        # Only the selected file is decompressed on a rerun, not every stored output
+        outputs = list(all_outputs)
+        selected = st.selectbox(
+            "File",
+            range(len(outputs)),
+            format_func=lambda idx: outputs[idx].file_name,
         )
+        stored = outputs[selected]
+        with stored.download_file() as data:
+            st.download_button(
+                f"Download Transformed {stored.file_name}",
+                data,
+                stored.download_name,
+                stored.mime,
+            )
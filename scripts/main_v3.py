@@ -159,9 +159,14 @@ DEFAULT_MAPPING = {
 }
 
 mapping_file = "mapping.json"
+# Keys starting with "_" (e.g. "_rules") are settings for the newer app, not
+# LR fields; set them aside and write them back untouched on save
+mapping_meta = {}
 if os.path.exists(mapping_file):
     with open(mapping_file, "r") as f:
         mapping_dict = json.load(f)
+    mapping_meta = {k: v for k, v in mapping_dict.items() if k.startswith("_")}
+    mapping_dict = {k: v for k, v in mapping_dict.items() if not k.startswith("_")}
 else:
     mapping_dict = DEFAULT_MAPPING.copy()
 
@@ -218,14 +223,14 @@ col1, col2, col3 = st.columns([1, 2, 7])
 with col1:
     if st.button("Save Mapping"):
         with open(mapping_file, "w") as f:
-            json.dump(mapping_dict, f, indent=4)
+            json.dump({**mapping_meta, **mapping_dict}, f, indent=4)
         st.success("Mapping saved successfully!")
 
 with col2:
     if st.button("Reset Mapping to Default"):
         mapping_dict = DEFAULT_MAPPING.copy()
         with open(mapping_file, "w") as f:
-            json.dump(mapping_dict, f, indent=4)
+            json.dump({**mapping_meta, **mapping_dict}, f, indent=4)
         st.success("Mapping has been reset to default.")
 
 
@@ -0,0 +1,315 @@
+import json
+import os
+from typing import NamedTuple
+
+import pandas as pd
+
+from normalization import RULES_KEY, normalize_values, rules_for, validate_rules
+
+MARKETPLACES = ("myntra", "ajio", "flipkart")
+
+# String columns with at most this share of distinct values are stored as category
+CATEGORY_MAX_RATIO = 0.5
+# Rows checked first, so high-cardinality columns are skipped without a full pass
+CATEGORY_SAMPLE_ROWS = 10_000
+
+# Default mapping dictionary
+DEFAULT_MAPPING = {
+    "Brand Name": {"myntra": "brand", "ajio": "*Brand", "flipkart": "Brand"},
+    "Color Grouping Code": {
+        "myntra": "styleId",
+        "ajio": "*Style Code",
+        "flipkart": "Style Code",
+    },
+    "Vendor Style Code": {
+        "myntra": "vendorSkuCode",
+        "ajio": "*Item SKU",
+        "flipkart": "Seller SKU ID",
+    },
+    "Size": {"myntra": "Standard Size", "ajio": "*Size", "flipkart": "Size"},
+    "Color": {
+        "myntra": "Brand Colour (Remarks)",
+        "ajio": "*Primary Color",
+        "flipkart": "Brand Color",
+    },
+    "Material": {"myntra": "Fabric", "ajio": "*Fabric Detail", "flipkart": "Fabric"},
+    "MRP": {"myntra": "MRP", "ajio": "*MRP", "flipkart": "MRP"},
+    "Selling Price": {
+        "myntra": "Selling Price",
+        "ajio": "Selling Price",
+        "flipkart": "Selling Price",
+    },
+    "Stock / Inventory": {"myntra": "Stock Type", "ajio": "Stock Type", "flipkart": ""},
+    "Print & Pattern": {
+        "myntra": "Print or Pattern Type",
+        "ajio": "*Pattern",
+        "flipkart": "Pattern",
+    },
+    "Work": {"myntra": "Work", "ajio": "Work", "flipkart": ""},
+    "Lining Material": {
+        "myntra": "Lining Fabric",
+        "ajio": "*Lining",
+        "flipkart": "Lining Material",
+    },
+    "Sleeve Type": {
+        "myntra": "Sleeve Styling",
+        "ajio": "Sleeve Type",
+        "flipkart": "Sleeve Style",
+    },
+    "Neck Type": {"myntra": "Neck", "ajio": "*Neckline", "flipkart": "Neck"},
+    "Type": {"myntra": "Dress Shape", "ajio": "*Style Type", "flipkart": "Dress Type"},
+    "Packed Width (inches)": {
+        "myntra": "",
+        "ajio": "*articleDimensionsUnitWidth",
+        "flipkart": "packageDimensionsWidth",
+    },
+    "Packed Height (inches)": {
+        "myntra": "",
+        "ajio": "*articleDimensionsUnitHeight",
+        "flipkart": "packageDimensionsHeight",
+    },
+    "Item Weight (kgs)": {
+        "myntra": "",
+        "ajio": "*articleDimensionsUnitWeight",
+        "flipkart": "packageDimensionsWeight",
+    },
+    "Packed Length (inches)": {
+        "myntra": "",
+        "ajio": "*articleDimensionsUnitLength",
+        "flipkart": "packageDimensionsLength",
+    },
+    "Pockets": {
+        "myntra": "Number of Pockets",
+        "ajio": "Number of Pockets",
+        "flipkart": "",
+    },
+    "Care": {"myntra": "Wash Care", "ajio": "Care", "flipkart": "Fabric Care"},
+    "Product Details": {
+        "myntra": "Product Details",
+        "ajio": "*Product Name",
+        "flipkart": "Description",
+    },
+    "Image URL 1": {
+        "myntra": "Front Image",
+        "ajio": "*Main Image URL",
+        "flipkart": "Main Image URL",
+    },
+    "Image URL 2": {
+        "myntra": "Side Image",
+        "ajio": "Other Image URL 1",
+        "flipkart": "Other Image URL 1",
+    },
+    "Image URL 3": {
+        "myntra": "Back Image",
+        "ajio": "Other Image URL 2",
+        "flipkart": "Other Image URL 2",
+    },
+    "Image URL 4": {
+        "myntra": "Detail Angle",
+        "ajio": "Other Image URL 3",
+        "flipkart": "Other Image URL 3",
+    },
+    "Image URL 5": {
+        "myntra": "Look Shot Image",
+        "ajio": "Other Image URL 4",
+        "flipkart": "Other Image URL 4",
+    },
+    "Transparency of Fabric": {
+        "myntra": "Transparency",
+        "ajio": "Transparency",
+        "flipkart": "",
+    },
+    "Color Family": {
+        "myntra": "Prominent Colour",
+        "ajio": "*Color Family",
+        "flipkart": "Color",
+    },
+    "Occasion": {"myntra": "Occasion", "ajio": "*Occasion", "flipkart": "Occasion"},
+    "GST Rate": {"myntra": "", "ajio": "", "flipkart": ""},
+    "HSN Code": {"myntra": "HSN", "ajio": "*HSN", "flipkart": ""},
+    "Closure": {"myntra": "Closure", "ajio": "Closure", "flipkart": ""},
+    "Ideal for": {"myntra": "Ideal for", "ajio": "Ideal for", "flipkart": "Ideal For"},
+    "GTIN": {"myntra": "GTIN", "ajio": "GTIN", "flipkart": "EAN/UPC"},
+    "Manufacturing Date": {"myntra": "", "ajio": "", "flipkart": ""},
+    "Country Of Origin": {
+        "myntra": "Country Of Origin",
+        "ajio": "*Country of Origin",
+        "flipkart": "Country Of Origin",
+    },
+    "Fit": {"myntra": "", "ajio": "fit", "flipkart": ""},
+    "Model Details": {"myntra": "", "ajio": "model details", "flipkart": ""},
+}
+
+
+# Top-level mapping.json keys with this prefix are metadata (e.g. "_version"),
+# not LR fields
+META_PREFIX = "_"
+
+
+def split_mapping(raw: dict) -> (dict, dict):
+    """
+    Splits a parsed mapping file into (LR field mapping, metadata entries).
+    """
+    fields = {k: v for k, v in raw.items() if not k.startswith(META_PREFIX)}
+    meta = {k: v for k, v in raw.items() if k.startswith(META_PREFIX)}
+    return fields, meta
+
+
+def validate_mapping(mapping_dict: dict) -> dict:
+    """
+    Checks the mapping's shape and returns it normalized so every LR field maps
+    each marketplace to a column name or "". Raises ValueError when malformed.
+    """
+    if not isinstance(mapping_dict, dict):
+        raise ValueError("Mapping must be an object of LR field -> marketplace columns")
+    normalized = {}
+    for lr_field, mapping in mapping_dict.items():
+        if not isinstance(mapping, dict):
+            raise ValueError(f"Mapping for {lr_field!r} must be an object")
+        for marketplace, column in mapping.items():
+            if column is not None and not isinstance(column, str):
+                raise ValueError(
+                    f"Mapping for {lr_field!r} has a non-string {marketplace} column"
+                )
+        normalized[lr_field] = {
+            marketplace: mapping.get(marketplace) or "" for marketplace in MARKETPLACES
+        }
+    return normalized
+
+
+def load_mapping(mapping_file: str) -> dict:
+    """
+    Loads the field mapping from a JSON file, falling back to the default mapping.
+    """
+    if os.path.exists(mapping_file):
+        with open(mapping_file, "r") as f:
+            return validate_mapping(split_mapping(json.load(f))[0])
+    return DEFAULT_MAPPING.copy()
+
+
+def load_rules(mapping_file: str) -> dict:
+    """
+    Loads the value normalization rules ("_rules") from a mapping file, if any.
+    """
+    if os.path.exists(mapping_file):
+        with open(mapping_file, "r") as f:
+            return validate_rules(split_mapping(json.load(f))[1].get(RULES_KEY))
+    return {}
+
+
+class ColumnPlan(NamedTuple):
+    """
+    Column-selection plan for one marketplace: the LR fields in output order and,
+    for each of them, the marketplace column to read (None when unmapped).
+    `rules` are the (LR field, rule) value normalizations for this marketplace.
+    """
+
+    marketplace: str
+    lr_fields: list
+    source_columns: list
+    rules: tuple = ()
+
+    @property
+    def used_columns(self) -> set:
+        """
+        The marketplace columns the plan reads; everything else can be skipped on parse.
+        """
+        return {column for column in self.source_columns if column is not None}
+
+
+def compile_plan(
+    mapping_dict: dict, marketplace: str, rules: dict = None
+) -> ColumnPlan:
+    """
+    Resolves the mapping (and validated "_rules", if any) for a marketplace into a
+    ColumnPlan. Compile once per marketplace and reuse the plan for every file/chunk.
+    """
+    lr_fields = list(mapping_dict)
+    source_columns = [
+        mapping.get(marketplace) or None for mapping in mapping_dict.values()
+    ]
+    return ColumnPlan(
+        marketplace,
+        lr_fields,
+        source_columns,
+        rules_for(rules or {}, marketplace, lr_fields),
+    )
+
+
+def mapped_columns(mapping_dict: dict) -> set:
+    """
+    Every marketplace column referenced by the mapping, across all marketplaces.
+    A frame projected to these columns can be transformed for any marketplace.
+    """
+    return {
+        column
+        for mapping in mapping_dict.values()
+        for column in mapping.values()
+        if column
+    }
+
+
+def find_missing_headers(columns, plan: ColumnPlan) -> list:
+    """
+    Returns the marketplace columns the plan expects that are absent from `columns`.
+    """
+    present = set(columns)
+    return [
+        column
+        for column in plan.source_columns
+        if column is not None and column not in present
+    ]
+
+
+def _is_string_column(series: pd.Series) -> bool:
+    return series.dtype == object or isinstance(
+        series.dtype, (pd.StringDtype, pd.ArrowDtype)
+    )
+
+
+def categorize_low_cardinality(
+    df: pd.DataFrame, max_ratio: float = CATEGORY_MAX_RATIO
+) -> pd.DataFrame:
+    """
+    Returns `df` with repetitive string columns (Size, Color Family, Brand Name,
+    Country Of Origin, ...) stored as category, so memory and groupbys scale with
+    the number of distinct values rather than rows. Other columns are left as is.
+    """
+    columns = {}
+    converted = False
+    for column in df.columns:
+        series = df[column]
+        if _is_string_column(series) and len(series):
+            sample = series.iloc[:CATEGORY_SAMPLE_ROWS]
+            if sample.nunique() <= len(sample) * max_ratio:
+                categorical = series.astype("category")
+                if len(categorical.cat.categories) <= len(series) * max_ratio:
+                    series = categorical
+                    converted = True
+        columns[column] = series
+    if not converted:
+        return df
+    return pd.concat(columns, axis=1)
+
+
+def transform_catalog(
+    df: pd.DataFrame, plan: ColumnPlan, categorize: bool = False
+) -> (pd.DataFrame, list):
+    """
+    Transforms a marketplace catalog to LR's format.
+    Returns a tuple of (transformed DataFrame, list of missing expected header names).
+
+    The output is built with a single reindex over the source columns, so mapped
+    fields are gathered in one take and unmapped/missing fields share one null block.
+    The plan's normalization rules then rewrite values field by field.
+    With `categorize`, low-cardinality fields are stored as category.
+    """
+    missing_headers = find_missing_headers(df.columns, plan)
+
+    transformed_data = df.reindex(columns=plan.source_columns)
+    transformed_data.columns = plan.lr_fields
+    if plan.rules:
+        transformed_data = normalize_values(transformed_data, plan.rules)
+    if categorize:
+        transformed_data = categorize_low_cardinality(transformed_data)
+    return transformed_data, missing_headers
@@ -0,0 +1,151 @@
+import json
+import os
+import threading
+
+import pandas as pd
+
+from mapping_core import (
+    DEFAULT_MAPPING,
+    MARKETPLACES,
+    ColumnPlan,
+    compile_plan,
+    split_mapping,
+    validate_mapping,
+)
+from normalization import RULES_KEY, validate_rules
+
+# Column holding the LR field name in the editable mapping table
+LR_FIELD_COLUMN = "limeroad"
+
+
+def mapping_to_frame(mapping_dict: dict) -> pd.DataFrame:
+    """
+    The mapping as an editor table: one row per LR field, one column per marketplace.
+    """
+    return pd.DataFrame(
+        [
+            [lr_field] + [mapping[marketplace] for marketplace in MARKETPLACES]
+            for lr_field, mapping in mapping_dict.items()
+        ],
+        columns=[LR_FIELD_COLUMN, *MARKETPLACES],
+    )
+
+
+def mapping_from_frame(mapping_df: pd.DataFrame) -> dict:
+    """
+    Inverse of mapping_to_frame for an edited table; rows without an LR field are
+    dropped and empty cells become "".
+    """
+    mapping_df = mapping_df.fillna("")
+    columns = [mapping_df[marketplace].tolist() for marketplace in MARKETPLACES]
+    return {
+        lr_field: dict(zip(MARKETPLACES, row))
+        for lr_field, *row in zip(mapping_df[LR_FIELD_COLUMN].tolist(), *columns)
+        if lr_field
+    }
+
+
+class MappingRegistry:
+    """
+    Process-wide view of mapping.json. The file is parsed and validated once and
+    re-read only when its mtime/size changes (saving through the registry also
+    forces a reload); compiled ColumnPlans and the editor table are kept per
+    loaded version.
+    """
+
+    def __init__(self, mapping_file: str):
+        self.mapping_file = mapping_file
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._mapping = None
+        self._meta = {}
+        self._rules = {}
+        self._plans = {}
+        self._frame = None
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.mapping_file)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _refresh(self):
+        stamp = self._file_stamp()
+        if self._mapping is not None and stamp == self._stamp:
+            return
+        if stamp is None:
+            mapping, meta = DEFAULT_MAPPING, {}
+        else:
+            with open(self.mapping_file, "r") as f:
+                mapping, meta = split_mapping(json.load(f))
+        self._mapping = validate_mapping(mapping)
+        self._rules = validate_rules(meta.get(RULES_KEY))
+        self._meta = meta
+        self._stamp = stamp
+        self._plans = {}
+        self._frame = None
+
+    @property
+    def mapping(self) -> dict:
+        with self._lock:
+            self._refresh()
+            return self._mapping
+
+    @property
+    def meta(self) -> dict:
+        with self._lock:
+            self._refresh()
+            return self._meta
+
+    @property
+    def rules(self) -> dict:
+        """
+        The validated value normalization rules ("_rules" in the mapping file).
+        """
+        with self._lock:
+            self._refresh()
+            return self._rules
+
+    @property
+    def version(self):
+        """
+        Identifies the loaded mapping: the file's "_version" entry when present,
+        plus its mtime/size stamp.
+        """
+        with self._lock:
+            self._refresh()
+            return self._meta.get("_version"), self._stamp
+
+    def plan(self, marketplace: str) -> ColumnPlan:
+        with self._lock:
+            self._refresh()
+            if marketplace not in self._plans:
+                self._plans[marketplace] = compile_plan(
+                    self._mapping, marketplace, self._rules
+                )
+            return self._plans[marketplace]
+
+    def frame(self) -> pd.DataFrame:
+        """
+        The editor table for the loaded mapping (a copy, safe to hand to widgets).
+        """
+        with self._lock:
+            self._refresh()
+            if self._frame is None:
+                self._frame = mapping_to_frame(self._mapping)
+            return self._frame.copy()
+
+    def save(self, mapping_dict: dict):
+        """
+        Writes the mapping back, keeping metadata entries such as "_version".
+        """
+        mapping_dict = validate_mapping(mapping_dict)
+        with self._lock:
+            self._refresh()
+            with open(self.mapping_file, "w") as f:
+                json.dump({**self._meta, **mapping_dict}, f, indent=4)
+            self._mapping = None
+
+    def reset(self):
+        self.save(DEFAULT_MAPPING)
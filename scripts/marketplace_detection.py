@@ -0,0 +1,73 @@
+from typing import NamedTuple
+
+from mapping_core import MARKETPLACES
+
+# Below this share of its mapped columns found, a marketplace is not picked automatically
+MIN_COVERAGE = 0.5
+# The best marketplace must beat the runner-up by this much coverage to be picked
+MIN_MARGIN = 0.2
+
+
+class Detection(NamedTuple):
+    """
+    Marketplace detected from a header row. `marketplace` is the best match (None
+    when no column matched at all), `scores` the coverage per marketplace, and
+    `ambiguous` is set when the user should confirm the choice.
+    """
+
+    marketplace: str
+    scores: dict
+    ambiguous: bool
+
+
+class MarketplaceIndex:
+    """
+    Inverted index from marketplace column name to the marketplaces that use it.
+    A header row is scored in one pass over its columns instead of comparing it
+    against every marketplace's column list.
+    """
+
+    def __init__(self, mapping_dict: dict):
+        self.columns = {marketplace: set() for marketplace in MARKETPLACES}
+        for mapping in mapping_dict.values():
+            for marketplace, column in mapping.items():
+                if column and marketplace in self.columns:
+                    self.columns[marketplace].add(column)
+        self.index = {}
+        for marketplace, columns in self.columns.items():
+            for column in columns:
+                self.index.setdefault(column, []).append(marketplace)
+
+    def scores(self, header) -> dict:
+        """
+        Share of each marketplace's mapped columns that appear in `header`.
+        """
+        hits = dict.fromkeys(self.columns, 0)
+        for column in set(header):
+            for marketplace in self.index.get(column, ()):
+                hits[marketplace] += 1
+        return {
+            marketplace: hits[marketplace] / len(columns) if columns else 0.0
+            for marketplace, columns in self.columns.items()
+        }
+
+    def detect(
+        self, header, min_coverage: float = MIN_COVERAGE, min_margin: float = MIN_MARGIN
+    ) -> Detection:
+        scores = self.scores(header)
+        ranked = sorted(scores, key=scores.get, reverse=True)
+        best = ranked[0] if ranked and scores[ranked[0]] > 0 else None
+        if best is None:
+            return Detection(None, scores, True)
+        runner_up = scores[ranked[1]] if len(ranked) > 1 else 0.0
+        ambiguous = scores[best] < min_coverage or scores[best] - runner_up < min_margin
+        return Detection(best, scores, ambiguous)
+
+
+def describe_detection(detection: Detection) -> str:
+    return ", ".join(
+        f"{marketplace} {score:.0%}"
+        for marketplace, score in sorted(
+            detection.scores.items(), key=lambda item: item[1], reverse=True
+        )
+    )
@@ -0,0 +1,205 @@
+"""
+Value normalization rules, kept in the mapping file under "_rules":
+
+    "_rules": {
+        "Sleeve Type": [{"type": "regex", "pattern": "(?i)\\s*sleeves?$", "replace": ""}],
+        "MRP": [{"type": "number", "decimals": 2}],
+        "Item Weight (kgs)": [{"type": "unit", "to": "kg", "from": "g",
+                               "marketplaces": ["ajio"], "enabled": false,
+                               "note": "Assumes Ajio's item weight is in grams"}]
+    }
+
+A rule applies to every marketplace unless it lists "marketplaces", and is
+skipped while "enabled" is false. The "from" unit of a unit rule is an assumption
+about the source file (used for bare numbers only), so the shipped unit rules are
+disabled until that assumption is confirmed for the marketplace; "note" is free
+text for writing it down.
+
+Each rule runs once per distinct value of the field (via pd.factorize) with
+vectorized string/numeric operations, so the cost follows the number of distinct
+values rather than the number of rows. Values a rule cannot parse are left as is.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+RULE_TYPES = ("map", "regex", "number", "unit")
+RULES_KEY = "_rules"
+
+# Factors to a base unit per dimension: centimetres for length, kilograms for weight
+UNIT_FACTORS = {
+    "mm": ("length", 0.1),
+    "cm": ("length", 1.0),
+    "cms": ("length", 1.0),
+    "m": ("length", 100.0),
+    "in": ("length", 2.54),
+    "inch": ("length", 2.54),
+    "inches": ("length", 2.54),
+    "ft": ("length", 30.48),
+    "g": ("weight", 0.001),
+    "gm": ("weight", 0.001),
+    "gms": ("weight", 0.001),
+    "grams": ("weight", 0.001),
+    "kg": ("weight", 1.0),
+    "kgs": ("weight", 1.0),
+    "lb": ("weight", 0.45359237),
+    "lbs": ("weight", 0.45359237),
+}
+
+_NUMBER = r"(-?\d+(?:\.\d+)?)"
+
+
+def validate_rules(rules) -> dict:
+    """
+    Checks the "_rules" entry of a mapping file and returns it with every field's
+    rules as a list. Raises ValueError when malformed.
+    """
+    if rules is None:
+        return {}
+    if not isinstance(rules, dict):
+        raise ValueError("Rules must be an object of LR field -> list of rules")
+    validated = {}
+    for lr_field, field_rules in rules.items():
+        if isinstance(field_rules, dict):
+            field_rules = [field_rules]
+        if not isinstance(field_rules, list):
+            raise ValueError(f"Rules for {lr_field!r} must be a list")
+        for rule in field_rules:
+            rule_type = rule.get("type") if isinstance(rule, dict) else None
+            if rule_type not in RULE_TYPES:
+                raise ValueError(
+                    f"Rule for {lr_field!r} must have a type out of {', '.join(RULE_TYPES)}"
+                )
+            if not isinstance(rule.get("enabled", True), bool):
+                raise ValueError(f"'enabled' for {lr_field!r} must be true or false")
+            if rule_type == "map" and not isinstance(rule.get("values"), dict):
+                raise ValueError(f"Map rule for {lr_field!r} needs a 'values' object")
+            if rule_type == "regex":
+                try:
+                    re.compile(rule.get("pattern", ""))
+                except re.error as e:
+                    raise ValueError(f"Bad regex for {lr_field!r}: {e}") from None
+            if rule_type == "unit":
+                for end in ("to", "from"):
+                    if rule.get(end) is not None and rule[end] not in UNIT_FACTORS:
+                        raise ValueError(
+                            f"Unit rule for {lr_field!r} has unknown unit {rule[end]!r}"
+                        )
+                if rule.get("to") is None:
+                    raise ValueError(f"Unit rule for {lr_field!r} needs a 'to' unit")
+        validated[lr_field] = field_rules
+    return validated
+
+
+def rules_for(rules: dict, marketplace: str, lr_fields) -> tuple:
+    """
+    The enabled (LR field, rule) pairs that apply to one marketplace's plan, in
+    file order.
+    """
+    fields = set(lr_fields)
+    return tuple(
+        (lr_field, rule)
+        for lr_field, field_rules in rules.items()
+        if lr_field in fields
+        for rule in field_rules
+        if rule.get("enabled", True)
+        and marketplace in rule.get("marketplaces", (marketplace,))
+    )
+
+
+def _format_numbers(numbers: pd.Series, decimals: int) -> pd.Series:
+    # Whole numbers are written without a decimal point ("4999", not "4999.0")
+    rounded = numbers.round(decimals)
+    text = rounded.astype(str)
+    whole = rounded.notna() & (rounded % 1 == 0)
+    text[whole] = rounded[whole].astype("int64").astype(str)
+    return text.where(rounded.notna())
+
+
+def _map_values(values: pd.Series, rule: dict) -> pd.Series:
+    if rule.get("case_sensitive"):
+        lookup, keys = rule["values"], values.str.strip()
+    else:
+        lookup = {str(k).strip().lower(): v for k, v in rule["values"].items()}
+        keys = values.str.strip().str.lower()
+    return keys.map(lookup).fillna(values)
+
+
+def _regex_values(values: pd.Series, rule: dict) -> pd.Series:
+    return values.str.replace(rule["pattern"], rule.get("replace", ""), regex=True)
+
+
+def _number_values(values: pd.Series, rule: dict) -> pd.Series:
+    # "₹1,299.00", "Rs. 1299" and "1299" all become "1299"
+    numbers = pd.to_numeric(
+        values.str.replace(",", "", regex=False).str.extract(_NUMBER, expand=False),
+        errors="coerce",
+    )
+    return _format_numbers(numbers, rule.get("decimals", 2)).fillna(values)
+
+
+def _unit_values(values: pd.Series, rule: dict) -> pd.Series:
+    dimension, to_factor = UNIT_FACTORS[rule["to"]]
+    parts = values.str.replace(",", "", regex=False).str.extract(
+        rf"^\s*{_NUMBER}\s*([A-Za-z]*)\.?\s*$"
+    )
+    # Bare numbers are in the rule's "from" unit; other dimensions' units don't match
+    units = parts[1].str.lower().replace("", rule.get("from") or rule["to"])
+    factors = units.map(
+        {unit: factor for unit, (dim, factor) in UNIT_FACTORS.items() if dim == dimension}
+    )
+    converted = pd.to_numeric(parts[0], errors="coerce") * factors / to_factor
+    return _format_numbers(converted, rule.get("decimals", 2)).fillna(values)
+
+
+RULE_FUNCTIONS = {
+    "map": _map_values,
+    "regex": _regex_values,
+    "number": _number_values,
+    "unit": _unit_values,
+}
+
+
+def _is_string_extension(dtype) -> bool:
+    if isinstance(dtype, pd.ArrowDtype):
+        return pa.types.is_string(dtype.pyarrow_dtype) or pa.types.is_large_string(
+            dtype.pyarrow_dtype
+        )
+    return isinstance(dtype, pd.StringDtype)
+
+
+def apply_rule(series: pd.Series, rule: dict) -> pd.Series:
+    """
+    Applies one rule to the distinct values of `series` and scatters the results
+    back to its rows; nulls stay null. The column keeps its dtype: Arrow and
+    pandas string columns stay so, category columns are re-categorized over the
+    new values and anything else comes back as object.
+    """
+    codes, uniques = pd.factorize(series)
+    if len(uniques) == 0:
+        return series
+    values = pd.Series(np.asarray(uniques, dtype=object)).astype(str)
+    normalized = RULE_FUNCTIONS[rule["type"]](values, rule).to_numpy(dtype=object)
+    if _is_string_extension(series.dtype):
+        # Map rules can yield non-string values from the JSON, which Arrow refuses
+        normalized = normalized.astype(str).astype(object)
+        result = pd.array(np.where(codes >= 0, normalized[codes], None), dtype=series.dtype)
+        return pd.Series(result, index=series.index, name=series.name)
+    result = np.where(codes >= 0, normalized[codes], None)
+    result = pd.Series(result, index=series.index, name=series.name, dtype=object)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return result.astype("category")
+    return result
+
+
+def normalize_values(transformed_df: pd.DataFrame, rules: tuple) -> pd.DataFrame:
+    """
+    Applies (LR field, rule) pairs to a transformed catalog in order, in place.
+    """
+    for lr_field, rule in rules:
+        if lr_field in transformed_df.columns:
+            transformed_df[lr_field] = apply_rule(transformed_df[lr_field], rule)
+    return transformed_df
@@ -0,0 +1,196 @@
+import gzip
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COPY_CHUNK_BYTES = 1024 * 1024
+
+
+def default_codec() -> str:
+    return "zstd" if zstandard is not None else "gzip"
+
+
+def _unique_name(name: str, used: set) -> str:
+    stem, extension = os.path.splitext(name)
+    candidate, n = name, 1
+    while candidate in used:
+        n += 1
+        candidate = f"{stem}_{n}{extension}"
+    used.add(candidate)
+    return candidate
+
+
+class StoredOutput:
+    """
+    One converted file, kept compressed in a spooled temp file: in memory while
+    small, spilled to `spill_dir` once the compressed data passes `spill_bytes`.
+    """
+
+    def __init__(
+        self,
+        file_name: str,
+        source,
+        codec: str = "gzip",
+        spill_bytes: int = 8 * 1024 * 1024,
+        spill_dir: str = None,
+        download_name: str = None,
+        mime: str = "text/csv",
+    ):
+        self.file_name = file_name
+        self.download_name = download_name or f"LR_{file_name}"
+        self.mime = mime
+        self.codec = codec
+        self.created = time.monotonic()
+        self.spill_bytes = spill_bytes
+        self.spill_dir = spill_dir
+        self._file = tempfile.SpooledTemporaryFile(max_size=spill_bytes, dir=spill_dir)
+        self.size = 0
+
+        source.seek(0)
+        with self._writer() as sink:
+            while True:
+                block = source.read(COPY_CHUNK_BYTES)
+                if not block:
+                    break
+                sink.write(block)
+                self.size += len(block)
+        self.compressed_size = self._file.tell()
+
+    @property
+    def spilled(self) -> bool:
+        return self.compressed_size > self.spill_bytes
+
+    def _writer(self):
+        if self.codec == "zstd":
+            return zstandard.ZstdCompressor().stream_writer(self._file, closefd=False)
+        return gzip.GzipFile(fileobj=self._file, mode="wb", compresslevel=6)
+
+    def open(self):
+        """
+        Returns a binary stream of the decompressed file.
+        """
+        self._file.seek(0)
+        if self.codec == "zstd":
+            return zstandard.ZstdDecompressor().stream_reader(self._file, closefd=False)
+        return gzip.GzipFile(fileobj=self._file, mode="rb")
+
+    def read(self) -> bytes:
+        with self.open() as f:
+            return f.read()
+
+    def download_file(self):
+        """
+        Decompresses into an unbuffered temp file in `spill_dir` and returns it
+        rewound, a raw file object st.download_button accepts as data.
+        """
+        target = tempfile.TemporaryFile(buffering=0, dir=self.spill_dir)
+        with self.open() as source:
+            shutil.copyfileobj(source, target, COPY_CHUNK_BYTES)
+        target.seek(0)
+        return target
+
+    def close(self):
+        self._file.close()
+
+
+class OutputStore:
+    """
+    A session's converted files. Entries older than `ttl_seconds` are dropped by
+    expire(); spilled temp files are removed when entries are closed or the store
+    is garbage-collected with its session.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        spill_bytes: int = 8 * 1024 * 1024,
+        spill_dir: str = None,
+        codec: str = None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.spill_bytes = spill_bytes
+        self.spill_dir = spill_dir
+        self.codec = codec or default_codec()
+        self._outputs = []
+        self._archive = None
+
+    def add(
+        self, file_name: str, source, download_name: str = None, mime: str = "text/csv"
+    ) -> StoredOutput:
+        stored = StoredOutput(
+            file_name,
+            source,
+            codec=self.codec,
+            spill_bytes=self.spill_bytes,
+            spill_dir=self.spill_dir,
+            download_name=download_name,
+            mime=mime,
+        )
+        self._outputs.append(stored)
+        self._drop_archive()
+        return stored
+
+    def write_zip(self, sink):
+        """
+        Writes every stored file into a ZIP archive on `sink`, one entry at a time,
+        decompressing straight into the archive so no whole file is held in memory.
+        Repeated download names get a "_2", "_3"... suffix so no entry is shadowed.
+        """
+        used = set()
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for stored in self._outputs:
+                entry = archive.open(
+                    _unique_name(stored.download_name, used),
+                    "w",
+                    force_zip64=stored.size >= zipfile.ZIP64_LIMIT,
+                )
+                with entry, stored.open() as source:
+                    shutil.copyfileobj(source, entry, COPY_CHUNK_BYTES)
+
+    def zip_archive(self):
+        """
+        Returns a rewound, unbuffered temp file in `spill_dir` holding a ZIP of all
+        stored files, which st.download_button takes as is. The archive is built on
+        disk once and reused across reruns until the store changes.
+        """
+        if self._archive is None:
+            self._archive = tempfile.TemporaryFile(buffering=0, dir=self.spill_dir)
+            self.write_zip(self._archive)
+        self._archive.seek(0)
+        return self._archive
+
+    def _drop_archive(self):
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+
+    def expire(self):
+        now = time.monotonic()
+        kept = []
+        for stored in self._outputs:
+            if now - stored.created > self.ttl_seconds:
+                stored.close()
+            else:
+                kept.append(stored)
+        if len(kept) != len(self._outputs):
+            self._drop_archive()
+        self._outputs = kept
+
+    def clear(self):
+        for stored in self._outputs:
+            stored.close()
+        self._outputs = []
+        self._drop_archive()
+
+    def __iter__(self):
+        return iter(self._outputs)
+
+    def __len__(self):
+        return len(self._outputs)
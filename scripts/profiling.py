@@ -0,0 +1,228 @@
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import NamedTuple
+
+try:
+    from pyinstrument import Profiler as PyinstrumentProfiler
+except ImportError:
+    PyinstrumentProfiler = None
+
+STAGE_LOGGER = "lr_catalog_mapper.stages"
+# Functions listed in a cProfile report, by cumulative time
+PROFILE_TOP_FUNCTIONS = 40
+# How often a stage's resident set size is sampled while it runs
+RSS_SAMPLE_SECONDS = 0.005
+
+
+class StageTiming(NamedTuple):
+    """
+    Totals for one pipeline stage of one file: wall time, rows handled, and how
+    far RSS rose above its level at the start of the stage (the largest rise
+    over repeated runs of the stage; None where RSS is unavailable).
+    """
+
+    stage: str
+    seconds: float
+    rows: int
+    peak_rss_delta_mb: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else None
+
+
+class _Stage:
+    rows = 0
+
+
+def current_rss_mb() -> float:
+    """
+    The process's current resident set size in MB, or None where /proc is missing.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+class _RssSampler:
+    """
+    Samples current RSS on a background thread while a stage runs. Unlike
+    ru_maxrss, which only ever holds the process-lifetime high-water mark, this
+    sees the peak of each stage on its own.
+    """
+
+    def __init__(self):
+        self.start_mb = current_rss_mb()
+        self.peak_mb = self.start_mb
+        self._done = threading.Event()
+        self._thread = None
+        if self.start_mb is not None:
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+
+    def _sample(self):
+        while not self._done.wait(RSS_SAMPLE_SECONDS):
+            self._record(current_rss_mb())
+
+    def _record(self, rss_mb: float):
+        if rss_mb is not None and rss_mb > self.peak_mb:
+            self.peak_mb = rss_mb
+
+    def stop(self) -> float:
+        """
+        Ends sampling; returns the rise of the peak over the starting RSS in MB.
+        """
+        if self._thread is None:
+            return None
+        self._done.set()
+        self._thread.join()
+        self._record(current_rss_mb())
+        return self.peak_mb - self.start_mb
+
+
+class StageTimer:
+    """
+    Accumulates StageTiming per stage name; time and rows of repeated stages (one
+    per chunk when streaming) are summed, and stages are reported in first-seen
+    order.
+    """
+
+    def __init__(self):
+        self._totals = {}
+
+    def add(self, stage: str, seconds: float, rows: int, peak_rss_delta_mb: float):
+        seconds_total, rows_total, rss_peak = self._totals.get(stage, (0.0, 0, None))
+        if peak_rss_delta_mb is not None:
+            rss_peak = max(rss_peak or 0.0, peak_rss_delta_mb)
+        self._totals[stage] = (seconds_total + seconds, rows_total + rows, rss_peak)
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Times the block; set `.rows` on the yielded object to record throughput.
+        """
+        record = _Stage()
+        sampler = _RssSampler()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            seconds = time.perf_counter() - start
+            self.add(name, seconds, record.rows, sampler.stop())
+
+    def iterate(self, name: str, chunks):
+        """
+        Yields from an iterator of frames, timing each step of it as `name`.
+        """
+        chunks = iter(chunks)
+        while True:
+            with self.stage(name) as record:
+                chunk = next(chunks, None)
+                record.rows = 0 if chunk is None else len(chunk)
+            if chunk is None:
+                return
+            yield chunk
+
+    @property
+    def stages(self) -> tuple:
+        return tuple(
+            StageTiming(stage, seconds, rows, rss)
+            for stage, (seconds, rows, rss) in self._totals.items()
+        )
+
+
+def stage_records(file_name: str, stages: tuple) -> list:
+    """
+    Flat dicts (one per stage) for tables and JSON logs.
+    """
+    return [
+        {
+            "file": file_name,
+            "stage": timing.stage,
+            "seconds": round(timing.seconds, 4),
+            "rows": timing.rows,
+            "rows_per_second": (
+                round(timing.rows_per_second) if timing.rows_per_second else None
+            ),
+            "peak_rss_delta_mb": (
+                round(timing.peak_rss_delta_mb, 1)
+                if timing.peak_rss_delta_mb is not None
+                else None
+            ),
+        }
+        for timing in stages
+    ]
+
+
+def stage_logger() -> logging.Logger:
+    """
+    Logger writing one JSON object per line to stderr, unless the host
+    application configured handlers for it already.
+    """
+    logger = logging.getLogger(STAGE_LOGGER)
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+def log_stages(file_name: str, stages: tuple, **fields):
+    stage_logger().info(
+        json.dumps(
+            {
+                "event": "conversion_stages",
+                "file": file_name,
+                **fields,
+                "stages": [
+                    {k: v for k, v in record.items() if k != "file"}
+                    for record in stage_records(file_name, stages)
+                ],
+            }
+        )
+    )
+
+
+@contextmanager
+def profiled(enabled: bool = True):
+    """
+    Profiles the block with pyinstrument when installed, else cProfile. Yields
+    a list that receives the text report when the block exits.
+    """
+    report = []
+    if not enabled:
+        yield report
+        return
+    if PyinstrumentProfiler is not None:
+        profiler = PyinstrumentProfiler()
+        profiler.start()
+        try:
+            yield report
+        finally:
+            profiler.stop()
+            report.append(profiler.output_text(unicode=True))
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield report
+    finally:
+        profiler.disable()
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(
+            PROFILE_TOP_FUNCTIONS
+        )
+        report.append(text.getvalue())
@@ -0,0 +1,290 @@
+import sys
+from typing import NamedTuple
+
+import openpyxl
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+try:
+    import python_calamine  # noqa: F401
+
+    HAS_CALAMINE = True
+except ImportError:
+    HAS_CALAMINE = False
+
+EXCEL_ENGINES = ("calamine", "openpyxl")
+
+# Arrow-backed strings keep cells in contiguous Arrow buffers instead of one
+# Python object per cell
+ARROW_STRING = pd.ArrowDtype(pa.string())
+
+# pandas' default na_values, so every Excel engine yields the same missing cells
+NA_STRINGS = frozenset(
+    [
+        "",
+        "#N/A",
+        "#N/A N/A",
+        "#NA",
+        "-1.#IND",
+        "-1.#QNAN",
+        "-NaN",
+        "-nan",
+        "1.#IND",
+        "1.#QNAN",
+        "<NA>",
+        "N/A",
+        "NA",
+        "NULL",
+        "NaN",
+        "None",
+        "n/a",
+        "nan",
+        "null",
+    ]
+)
+
+
+class ExcelOptions(NamedTuple):
+    """
+    Where the catalog lives inside a workbook. Ajio/Flipkart templates carry
+    instruction rows above the header, so `header_row` is the 0-based row index of
+    the header and `sheet_name` is a sheet name or 0-based sheet index.
+    `engine` is one of EXCEL_ENGINES, or None to pick the fastest available.
+    """
+
+    sheet_name: object = 0
+    header_row: int = 0
+    engine: str = None
+
+
+def is_csv(file_name: str) -> bool:
+    return file_name.endswith(".csv")
+
+
+def string_dtype(arrow_strings: bool = False):
+    return ARROW_STRING if arrow_strings else str
+
+
+def default_excel_engine() -> str:
+    return "calamine" if HAS_CALAMINE else "openpyxl"
+
+
+def _select_sheet(workbook, sheet_name):
+    try:
+        if isinstance(sheet_name, int):
+            return workbook.worksheets[sheet_name]
+        return workbook[sheet_name]
+    except (IndexError, KeyError):
+        raise ValueError(
+            f"Worksheet {sheet_name!r} not found; available sheets: "
+            + ", ".join(repr(name) for name in workbook.sheetnames)
+        ) from None
+
+
+def _header_names(row) -> list:
+    # Same naming as pandas: blank headers become "Unnamed: i", repeats get ".N"
+    names = []
+    seen = {}
+    for i, value in enumerate(row):
+        name = f"Unnamed: {i}" if value is None else str(value)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _cell_text(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return None if value in NA_STRINGS else value
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def read_header(
+    uploaded_file, file_name: str, excel_options: ExcelOptions = ExcelOptions()
+) -> list:
+    """
+    Reads only the header row of a CSV/XLSX upload, without parsing any data rows.
+    The file position is rewound afterwards so the full read can follow.
+    """
+    if is_csv(file_name):
+        header = pd.read_csv(uploaded_file, dtype=str, nrows=0).columns.tolist()
+    else:
+        workbook = openpyxl.load_workbook(uploaded_file, read_only=True, data_only=True)
+        try:
+            sheet = _select_sheet(workbook, excel_options.sheet_name)
+            header_row = excel_options.header_row + 1
+            row = next(
+                sheet.iter_rows(
+                    min_row=header_row, max_row=header_row, values_only=True
+                ),
+                (),
+            )
+        finally:
+            workbook.close()
+        header = [str(value) for value in row if value is not None]
+    uploaded_file.seek(0)
+    return header
+
+
+def _column_filter(usecols):
+    # A membership callable lets pandas skip absent names instead of raising
+    if usecols is None:
+        return None
+    return set(usecols).__contains__
+
+
+def read_excel_streaming(
+    uploaded_file,
+    excel_options: ExcelOptions = ExcelOptions(),
+    usecols=None,
+    arrow_strings: bool = False,
+) -> pd.DataFrame:
+    """
+    Reads one sheet with openpyxl in read-only mode, streaming rows and keeping only
+    the projected columns as strings instead of materializing the whole sheet.
+    """
+    usecols = _column_filter(usecols)
+    workbook = openpyxl.load_workbook(uploaded_file, read_only=True, data_only=True)
+    try:
+        sheet = _select_sheet(workbook, excel_options.sheet_name)
+        rows = sheet.iter_rows(min_row=excel_options.header_row + 1, values_only=True)
+        header = _header_names(next(rows, ()))
+        keep = [i for i, name in enumerate(header) if usecols is None or usecols(name)]
+        width = len(header)
+        records = []
+        for row in rows:
+            if len(row) < width:
+                row = row + (None,) * (width - len(row))
+            records.append([_cell_text(row[i]) for i in keep])
+    finally:
+        workbook.close()
+
+    # Blank rows within the data are kept as all-null rows and trailing ones are
+    # dropped, as pd.read_excel does with both openpyxl and calamine
+    while records and all(value is None for value in records[-1]):
+        records.pop()
+    df = pd.DataFrame(records, columns=[header[i] for i in keep], dtype=object)
+    return df.astype(ARROW_STRING) if arrow_strings else df
+
+
+def read_excel_catalog(
+    uploaded_file,
+    excel_options: ExcelOptions = ExcelOptions(),
+    usecols=None,
+    arrow_strings: bool = False,
+) -> pd.DataFrame:
+    """
+    Reads an XLSX upload with every cell as a string, using calamine when it is
+    installed and the openpyxl streaming reader otherwise.
+    """
+    engine = excel_options.engine or default_excel_engine()
+    if engine == "openpyxl":
+        return read_excel_streaming(
+            uploaded_file, excel_options, usecols=usecols, arrow_strings=arrow_strings
+        )
+    if engine not in EXCEL_ENGINES:
+        raise ValueError(f"Unknown Excel engine: {engine}")
+    return pd.read_excel(
+        uploaded_file,
+        engine=engine,
+        sheet_name=excel_options.sheet_name,
+        header=excel_options.header_row,
+        dtype=string_dtype(arrow_strings),
+        usecols=_column_filter(usecols),
+    )
+
+
+def read_csv_arrow(uploaded_file, usecols=None) -> pd.DataFrame:
+    """
+    Reads a CSV with pyarrow's reader straight into Arrow-backed string columns.
+    pyarrow.csv is used directly because pandas' pyarrow engine materializes every
+    column before applying usecols, which defeats the projection.
+    Headers pandas would rename (repeated or blank names) are read with pandas, so
+    both paths name the columns the same way.
+    """
+    header = pd.read_csv(uploaded_file, dtype=str, nrows=0).columns
+    uploaded_file.seek(0)
+    raw_header = pd.read_csv(
+        uploaded_file, header=None, nrows=1, dtype=str, keep_default_na=False
+    ).iloc[0]
+    uploaded_file.seek(0)
+    if list(raw_header) != list(header):
+        return pd.read_csv(
+            uploaded_file, dtype=ARROW_STRING, usecols=_column_filter(usecols)
+        )
+    if usecols is not None:
+        usecols = set(usecols)
+        header = [column for column in header if column in usecols]
+    convert_options = pyarrow.csv.ConvertOptions(
+        include_columns=list(header),
+        column_types={column: pa.string() for column in header},
+        null_values=list(NA_STRINGS),
+        strings_can_be_null=True,
+    )
+    # Quoted values may span lines (e.g. multi-line product descriptions)
+    parse_options = pyarrow.csv.ParseOptions(newlines_in_values=True)
+    table = pyarrow.csv.read_csv(
+        uploaded_file, parse_options=parse_options, convert_options=convert_options
+    )
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def read_catalog(
+    uploaded_file,
+    file_name: str,
+    usecols=None,
+    excel_options: ExcelOptions = ExcelOptions(),
+    arrow_strings: bool = False,
+) -> pd.DataFrame:
+    """
+    Reads a CSV/XLSX upload with every cell as a string.
+    When `usecols` is given, only those columns are parsed; names missing from the
+    file are ignored rather than raising. With `arrow_strings` the columns are
+    Arrow-backed strings rather than Python objects.
+    """
+    if is_csv(file_name):
+        if arrow_strings:
+            return read_csv_arrow(uploaded_file, usecols=usecols)
+        return pd.read_csv(uploaded_file, dtype=str, usecols=_column_filter(usecols))
+    return read_excel_catalog(
+        uploaded_file, excel_options, usecols=usecols, arrow_strings=arrow_strings
+    )
+
+
+def read_csv_chunks(
+    uploaded_file, chunksize: int, usecols=None, arrow_strings: bool = False
+):
+    """
+    Iterates over a CSV upload in DataFrames of at most `chunksize` rows.
+    """
+    return pd.read_csv(
+        uploaded_file,
+        dtype=string_dtype(arrow_strings),
+        usecols=_column_filter(usecols),
+        chunksize=chunksize,
+    )
+
+
+def peak_rss_mb() -> float:
+    """
+    Returns the process's lifetime peak resident set size in MB, or None where
+    unsupported. It never falls, so it only measures one run in a fresh process.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
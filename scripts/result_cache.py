@@ -0,0 +1,229 @@
+import hashlib
+import io
+import json
+import os
+import threading
+from typing import NamedTuple
+
+from cachetools import LRUCache
+
+from converter import ConversionResult
+from mapping_core import ColumnPlan
+from readers import ExcelOptions, is_csv
+
+
+class CachedConversion(NamedTuple):
+    """
+    A stored conversion: the LR file bytes plus what is needed to re-report it.
+    """
+
+    data: bytes
+    rows: int
+    missing_headers: list
+    suggestions: dict = None
+
+
+def content_digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def plan_digest(plan: ColumnPlan) -> str:
+    """
+    Hashes only the given marketplace's side of the mapping and its normalization
+    rules, so editing another marketplace's column leaves this plan's cached
+    results valid.
+    """
+    payload = json.dumps(
+        [plan.marketplace, plan.lr_fields, plan.source_columns, plan.rules],
+        sort_keys=True,
+    )
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def cache_key(
+    data: bytes,
+    file_name: str,
+    plan: ColumnPlan,
+    excel_options: ExcelOptions = ExcelOptions(),
+    output_format: str = "csv",
+) -> str:
+    """
+    Key for a conversion: (file content, marketplace, effective mapping, output
+    format), plus the sheet/header-row selection for Excel files since that
+    changes what is read.
+    """
+    key = (
+        f"{content_digest(data)}-{plan.marketplace}-{plan_digest(plan)}"
+        f"-{output_format}"
+    )
+    if not is_csv(file_name):
+        sheet = json.dumps([excel_options.sheet_name, excel_options.header_row])
+        key += "-" + hashlib.blake2b(sheet.encode(), digest_size=8).hexdigest()
+    return key
+
+
+def _output_size(output) -> int:
+    output.seek(0, os.SEEK_END)
+    size = output.tell()
+    output.seek(0)
+    return size
+
+
+def _output_bytes(output) -> bytes:
+    if isinstance(output, io.BytesIO):
+        return output.getvalue()
+    output.seek(0)
+    data = output.read()
+    output.seek(0)
+    return data
+
+
+class ConversionCache:
+    """
+    LRU cache of converted files capped by total size in bytes, with an optional
+    on-disk tier that keeps entries evicted from memory and survives restarts.
+    Outputs larger than `max_entry_bytes` (default: `max_bytes`) are not cached,
+    so they are never read into memory just to be stored.
+    Safe to share between Streamlit sessions.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        disk_dir: str = None,
+        max_disk_bytes: int = 0,
+        max_entry_bytes: int = None,
+    ):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.max_entry_bytes = max_entry_bytes or max_bytes
+        self._memory = LRUCache(maxsize=max_bytes, getsizeof=lambda e: len(e.data))
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def get(self, key: str) -> CachedConversion:
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry is None and self.disk_dir:
+            entry = self._read_disk(key)
+            if entry is not None:
+                self._put_memory(key, entry)
+        return entry
+
+    def put(self, key: str, entry: CachedConversion):
+        self._put_memory(key, entry)
+        if self.disk_dir:
+            self._write_disk(key, entry)
+
+    def get_result(self, key: str, file_name: str) -> ConversionResult:
+        """
+        Returns a cache hit as a ConversionResult, or None on a miss.
+        """
+        entry = self.get(key)
+        if entry is None:
+            return None
+        return ConversionResult(
+            file_name,
+            io.BytesIO(entry.data),
+            entry.rows,
+            entry.missing_headers,
+            None,
+            0.0,
+            False,
+            suggestions=entry.suggestions,
+            cached=True,
+        )
+
+    def put_result(self, key: str, result: ConversionResult):
+        """
+        Stores a successful conversion; rejected files and outputs over
+        `max_entry_bytes` are never cached.
+        """
+        if result.rejected or _output_size(result.output) > self.max_entry_bytes:
+            return
+        self.put(
+            key,
+            CachedConversion(
+                _output_bytes(result.output),
+                result.rows,
+                result.missing_headers,
+                result.suggestions,
+            ),
+        )
+
+    def _put_memory(self, key: str, entry: CachedConversion):
+        if len(entry.data) > self.max_bytes:
+            return
+        with self._lock:
+            self._memory[key] = entry
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.out")
+
+    def _read_disk(self, key: str) -> CachedConversion:
+        path = self._disk_path(key)
+        try:
+            with open(path + ".json", "r") as f:
+                meta = json.load(f)
+            with open(path, "rb") as f:
+                data = f.read()
+            # Refresh the mtime so pruning evicts the least recently used entries
+            os.utime(path)
+        except (OSError, ValueError):
+            # Includes an entry pruned by another session between the reads
+            return None
+        # JSON turns the (header, score) pairs into lists
+        suggestions = meta.get("suggestions")
+        if suggestions is not None:
+            suggestions = {
+                column: [tuple(match) for match in matches]
+                for column, matches in suggestions.items()
+            }
+        return CachedConversion(data, meta["rows"], meta["missing_headers"], suggestions)
+
+    def _write_disk(self, key: str, entry: CachedConversion):
+        if self.max_disk_bytes and len(entry.data) > self.max_disk_bytes:
+            return
+        path = self._disk_path(key)
+        # Write the data before its metadata, each then renamed into place, so
+        # readers and other sessions never see a partial entry
+        with open(path + ".tmp", "wb") as f:
+            f.write(entry.data)
+        os.replace(path + ".tmp", path)
+        with open(path + ".json.tmp", "w") as f:
+            json.dump(
+                {
+                    "rows": entry.rows,
+                    "missing_headers": entry.missing_headers,
+                    "suggestions": entry.suggestions,
+                },
+                f,
+            )
+        os.replace(path + ".json.tmp", path + ".json")
+        self._prune_disk()
+
+    def _prune_disk(self):
+        if not self.max_disk_bytes:
+            return
+        entries = []
+        for name in os.listdir(self.disk_dir):
+            if name.endswith(".out"):
+                path = os.path.join(self.disk_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    # Pruned by another session since the listing
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            for stale in (path + ".json", path):
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+            total -= size
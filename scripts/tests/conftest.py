@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The app modules live flat in scripts/, next to this directory
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
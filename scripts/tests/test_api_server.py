@@ -0,0 +1,223 @@
+import asyncio
+import concurrent.futures
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures.process import BrokenProcessPool
+
+from tornado.tcpclient import TCPClient
+from tornado.testing import AsyncHTTPTestCase, gen_test
+
+from api_server import RETRY_AFTER_SECONDS, ConversionService, make_app
+from cli import DEFAULT_MAPPING_FILE
+from readers import ExcelOptions
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MYNTRA_CSV = os.path.join(SCRIPTS_DIR, "input_files", "myntra.csv")
+
+
+async def wait_until(condition, timeout: float = 5.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "condition not reached in time"
+        await asyncio.sleep(0.01)
+
+
+class StalledExecutor:
+    """
+    Stands in for a process pool: holds every submitted job until the test fails
+    them, e.g. with BrokenProcessPool as when a worker is killed.
+    """
+
+    def __init__(self):
+        self.futures = []
+        self.shutdowns = 0
+
+    def submit(self, fn, *args, **kwargs):
+        future = concurrent.futures.Future()
+        self.futures.append(future)
+        return future
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        self.shutdowns += 1
+
+
+class ApiTestCase(AsyncHTTPTestCase):
+    # One worker and no queue: a single admitted job fills the service
+    workers = 1
+    max_queue = 0
+
+    def get_app(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.service = ConversionService(
+            DEFAULT_MAPPING_FILE, self.work_dir, self.workers, self.max_queue
+        )
+        return make_app(self.service)
+
+    def tearDown(self):
+        self.service.shutdown()
+        super().tearDown()
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def job_dirs(self) -> list:
+        return os.listdir(self.work_dir)
+
+
+class TestHealth(ApiTestCase):
+    def test_idle_service(self):
+        response = self.fetch("/health")
+
+        assert response.code == 200
+        health = json.loads(response.body)
+        assert health["status"] == "ok"
+        assert health["workers"] == 1
+        assert (health["running"], health["queue_depth"]) == (0, 0)
+        assert health["accepting"] is True
+        assert health["jobs"] == {"done": 0, "rejected": 0, "failed": 0, "throttled": 0}
+
+    def test_reports_admitted_jobs_as_queued_depth(self):
+        self.service.admit("held.csv", None, ExcelOptions(), {})
+
+        health = json.loads(self.fetch("/health").body)
+
+        assert health["queue_depth"] == 1
+        assert health["receiving"] == 1
+        assert health["accepting"] is False
+
+
+class TestBackpressure(ApiTestCase):
+    def test_full_service_refuses_uploads_with_429(self):
+        held = self.service.admit("held.csv", None, ExcelOptions(), {})
+
+        response = self.fetch("/convert?file_name=a.csv", method="POST", body="a,b\n1,2\n")
+
+        assert response.code == 429
+        assert response.headers["Retry-After"] == str(RETRY_AFTER_SECONDS)
+        body = json.loads(response.body)
+        assert body["error"] == "Conversion queue is full"
+        assert body["accepting"] is False
+        assert self.service.counts["throttled"] == 1
+        # Only the held job has a directory; the refused upload never got one
+        assert self.job_dirs() == [held.id]
+
+    def test_capacity_returns_once_a_job_is_released(self):
+        held = self.service.admit("held.csv", None, ExcelOptions(), {})
+        self.service.abandon(held)
+
+        health = json.loads(self.fetch("/health").body)
+
+        assert health["accepting"] is True
+        assert health["queue_depth"] == 0
+
+
+class TestAbandon(ApiTestCase):
+    @gen_test
+    async def test_disconnect_mid_upload_drops_the_job(self):
+        stream = await TCPClient().connect("127.0.0.1", self.get_http_port())
+        await stream.write(
+            b"PUT /convert?file_name=big.csv HTTP/1.1\r\n"
+            b"Host: localhost\r\nContent-Length: 100000\r\n\r\n" + b"a,b\n1,2\n" * 10
+        )
+        await wait_until(lambda: any(j.bytes_received for j in self.service.jobs.values()))
+        (job,) = self.service.jobs.values()
+        assert job.status == "receiving"
+        assert self.service.admitted == 1
+
+        stream.close()
+        await wait_until(lambda: self.service.admitted == 0)
+
+        assert job.status == "failed"
+        assert job.id not in self.service.jobs
+        assert not os.path.exists(job.dir)
+
+    def test_rejected_request_releases_its_slot(self):
+        response = self.fetch("/convert?file_name=empty.csv", method="POST", body="")
+
+        assert response.code == 400
+        assert json.loads(response.body)["error"] == "Empty request body"
+        assert self.service.admitted == 0
+        assert self.service.jobs == {}
+        assert self.job_dirs() == []
+
+    def test_bad_file_name_is_refused_before_admission(self):
+        response = self.fetch("/convert?file_name=notes.txt", method="POST", body="x")
+
+        assert response.code == 400
+        assert self.service.admitted == 0
+
+
+class TestConvert(ApiTestCase):
+    @gen_test(timeout=120)
+    async def test_wait_returns_the_converted_file(self):
+        with open(MYNTRA_CSV, "rb") as f:
+            body = f.read()
+
+        response = await self.http_client.fetch(
+            self.get_url("/convert?file_name=myntra.csv&wait=1&proceed_anyway=1"),
+            method="PUT",
+            body=body,
+            request_timeout=120,
+            raise_error=False,
+        )
+
+        assert response.code == 200
+        job = self.service.jobs[response.headers["X-Job-Id"]]
+        assert job.status == "done"
+        assert job.summary["marketplace"] == "myntra"
+        lines = response.body.decode().splitlines()
+        assert lines[0].startswith("Brand Name,")
+        assert len(lines) == job.summary["rows"] + 1
+        assert self.service.admitted == 0
+        # The upload itself is removed once converted
+        assert os.listdir(job.dir) == [job.summary["files"]["result"]]
+
+
+class TestBrokenPool(ApiTestCase):
+    workers = 2
+
+    @gen_test
+    async def test_broken_pool_is_replaced_once(self):
+        broken = StalledExecutor()
+        self.service._executor = broken
+        replacements = []
+        new_executor = self.service._new_executor
+
+        def counting_new_executor():
+            replacements.append(new_executor())
+            return replacements[-1]
+
+        self.service._new_executor = counting_new_executor
+        jobs = [
+            self.service.admit(f"{name}.csv", "myntra", ExcelOptions(), {})
+            for name in ("a", "b")
+        ]
+        tasks = [asyncio.ensure_future(self.service._convert(job)) for job in jobs]
+        await wait_until(lambda: len(broken.futures) == 2)
+
+        for future in broken.futures:
+            future.set_exception(BrokenProcessPool("A worker died"))
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert all(isinstance(result, BrokenProcessPool) for result in results)
+        assert broken.shutdowns == 1
+        assert len(replacements) == 1
+        assert self.service._executor is replacements[0]
+
+
+def test_startup_sweeps_job_directories_only():
+    work_dir = tempfile.mkdtemp()
+    try:
+        stale_job = os.path.join(work_dir, "0123456789abcdef0123456789abcdef")
+        os.makedirs(os.path.join(stale_job, "nested"))
+        os.makedirs(os.path.join(work_dir, "unrelated"))
+        with open(os.path.join(work_dir, "notes.txt"), "w") as f:
+            f.write("kept")
+
+        service = ConversionService(DEFAULT_MAPPING_FILE, work_dir, workers=1)
+        service.shutdown()
+
+        assert sorted(os.listdir(work_dir)) == ["notes.txt", "unrelated"]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
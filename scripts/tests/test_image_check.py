@@ -0,0 +1,220 @@
+"""
+image_check against a local tornado stand-in for an image host:
+
+    /ok/<name>       200
+    /missing/<name>  404
+    /moved/<name>    302 to /ok/<name>
+    /nohead/<name>   405 to HEAD, 206 to a ranged GET
+    /slow/<name>     answers after SLOW_SECONDS, past the test's timeout
+"""
+
+import asyncio
+import collections
+import threading
+
+import pandas as pd
+import pytest
+from tornado import httpserver, netutil, web
+
+from image_check import (
+    ImageCheckCache,
+    broken_images,
+    check_urls,
+    unique_image_urls,
+)
+
+SLOW_SECONDS = 2.0
+TIMEOUT_SECONDS = 0.5
+
+
+class StubState:
+    def __init__(self):
+        self.reset()
+
+    def reset(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests = collections.Counter()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+
+class StubImageHandler(web.RequestHandler):
+    def initialize(self, state: StubState):
+        self.state = state
+
+    async def _reply(self, kind: str, name: str):
+        state = self.state
+        state.requests[(self.request.method, f"/{kind}/{name}")] += 1
+        state.in_flight += 1
+        state.max_in_flight = max(state.max_in_flight, state.in_flight)
+        try:
+            await asyncio.sleep(SLOW_SECONDS if kind == "slow" else state.latency)
+        finally:
+            state.in_flight -= 1
+        if kind == "missing":
+            self.set_status(404)
+        elif kind == "moved":
+            self.redirect(f"/ok/{name}")
+        elif kind == "nohead" and self.request.method == "HEAD":
+            self.set_status(405)
+        elif kind == "nohead":
+            self.set_status(206)
+            self.write(b"\xff")
+
+    async def head(self, kind: str, name: str):
+        await self._reply(kind, name)
+
+    async def get(self, kind: str, name: str):
+        await self._reply(kind, name)
+
+
+@pytest.fixture(scope="module")
+def image_server():
+    """
+    Runs the stand-in on its own thread and event loop, since check_urls starts
+    (and closes) an event loop of its own.
+    """
+    state = StubState()
+    ready = threading.Event()
+    running = {}
+
+    async def serve():
+        app = web.Application(
+            [(r"/(\w+)/([\w.-]+)", StubImageHandler, {"state": state})]
+        )
+        server = httpserver.HTTPServer(app)
+        sockets = netutil.bind_sockets(0, "127.0.0.1")
+        server.add_sockets(sockets)
+        running["port"] = sockets[0].getsockname()[1]
+        running["loop"] = asyncio.get_running_loop()
+        running["stop"] = asyncio.Event()
+        ready.set()
+        await running["stop"].wait()
+        server.stop()
+
+    thread = threading.Thread(target=lambda: asyncio.run(serve()), daemon=True)
+    thread.start()
+    assert ready.wait(5)
+    yield f"http://127.0.0.1:{running['port']}", state
+    running["loop"].call_soon_threadsafe(running["stop"].set)
+    thread.join(5)
+
+
+@pytest.fixture
+def server(image_server):
+    base_url, state = image_server
+    state.reset()
+    return base_url, state
+
+
+def check(urls, cache=None, **options):
+    options.setdefault("timeout", TIMEOUT_SECONDS)
+    return check_urls(urls, cache or ImageCheckCache(), **options)
+
+
+def test_unique_image_urls_dedupes_across_rows_and_fields():
+    catalog = pd.DataFrame(
+        {
+            "Vendor Style Code": ["A-S", "A-M", "B-S"],
+            "Image URL 1": ["http://x/a1.jpg", "http://x/a1.jpg", "http://x/b1.jpg"],
+            "Image URL 2": ["http://x/a2.jpg", "http://x/a2.jpg", None],
+            "Image URL 3": ["http://x/a1.jpg", " ", ""],
+        }
+    )
+
+    urls = unique_image_urls(catalog)
+
+    assert sorted(urls) == ["http://x/a1.jpg", "http://x/a2.jpg", "http://x/b1.jpg"]
+
+
+def test_status_per_url(server):
+    base_url, _ = server
+    urls = [f"{base_url}/{kind}/1.jpg" for kind in ("ok", "missing", "moved", "slow")]
+
+    results = check(urls)
+
+    ok, missing, moved, slow = (results[url] for url in urls)
+    assert (ok.ok, ok.status, ok.error) == (True, 200, None)
+    assert (missing.ok, missing.status) == (False, 404)
+    assert missing.error
+    # Redirects are followed to the image itself
+    assert (moved.ok, moved.status) == (True, 200)
+    # A timeout has no HTTP status, only an error
+    assert (slow.ok, slow.status) == (False, 0)
+    assert slow.error
+
+
+def test_head_not_allowed_falls_back_to_ranged_get(server):
+    base_url, state = server
+    url = f"{base_url}/nohead/1.jpg"
+
+    status = check([url])[url]
+
+    assert (status.ok, status.status) == (True, 206)
+    assert state.requests[("HEAD", "/nohead/1.jpg")] == 1
+    assert state.requests[("GET", "/nohead/1.jpg")] == 1
+
+
+def test_each_unique_url_is_requested_once_then_served_from_cache(server):
+    base_url, state = server
+    # 30 SKUs of 3 styles, each style sharing two images across its sizes
+    catalog = pd.DataFrame(
+        {
+            "Image URL 1": [f"{base_url}/ok/{i % 3}-1.jpg" for i in range(30)],
+            "Image URL 2": [f"{base_url}/missing/{i % 3}-2.jpg" for i in range(30)],
+        }
+    )
+    cache = ImageCheckCache()
+
+    urls = unique_image_urls(catalog)
+    first = check(urls, cache)
+
+    assert len(urls) == 6
+    assert sum(state.requests.values()) == 6
+    assert all(count == 1 for count in state.requests.values())
+
+    second = check(urls, cache)
+
+    assert sum(state.requests.values()) == 6
+    assert second == first
+
+
+def test_failed_connections_are_not_cached(server):
+    base_url, state = server
+    url = f"{base_url}/slow/1.jpg"
+    cache = ImageCheckCache()
+
+    check([url], cache)
+    check([url], cache)
+
+    assert cache.get(url) is None
+    assert state.requests[("HEAD", "/slow/1.jpg")] == 2
+
+
+def test_requests_in_flight_are_capped(server):
+    base_url, state = server
+    state.reset(latency=0.05)
+    urls = [f"{base_url}/ok/{i}.jpg" for i in range(40)]
+
+    results = check(urls, max_connections=4)
+
+    assert all(status.ok for status in results.values())
+    assert sum(state.requests.values()) == 40
+    assert 1 < state.max_in_flight <= 4
+
+
+def test_broken_images_maps_failures_to_rows_and_fields(server):
+    base_url, _ = server
+    catalog = pd.DataFrame(
+        {
+            "Image URL 1": [f"{base_url}/ok/a.jpg", f"{base_url}/missing/b.jpg"],
+            "Image URL 2": [f"{base_url}/missing/b.jpg", None],
+        }
+    )
+
+    broken = broken_images(catalog, check(unique_image_urls(catalog)))
+
+    assert broken[["row", "field", "status"]].values.tolist() == [
+        [0, "Image URL 2", 404],
+        [1, "Image URL 1", 404],
+    ]
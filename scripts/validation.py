@@ -0,0 +1,236 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from writers import ChunkedWriter
+
+# Package fields that must be numeric when filled in
+PACKAGE_FIELDS = (
+    "Packed Width (inches)",
+    "Packed Height (inches)",
+    "Packed Length (inches)",
+    "Item Weight (kgs)",
+)
+
+
+class Check(NamedTuple):
+    """
+    One validation rule. `invalid(df)` returns a boolean mask of failing rows; the
+    fields it needs must all be present in the catalog for it to run.
+    """
+
+    field: str
+    rule: str
+    fields: tuple
+    invalid: object
+
+
+def _unique_mask(series: pd.Series, test) -> np.ndarray:
+    """
+    Evaluates `test` on the distinct non-null values only and expands the result
+    to a row mask through the factorize codes. Nulls never fail.
+    """
+    codes, uniques = pd.factorize(series)
+    if len(uniques) == 0:
+        return np.zeros(len(series), dtype=bool)
+    failing = np.asarray(test(pd.Series(np.asarray(uniques, dtype=object)).astype(str)))
+    return (codes >= 0) & failing[codes]
+
+
+def _numbers(series: pd.Series) -> np.ndarray:
+    codes, uniques = pd.factorize(series)
+    values = pd.to_numeric(
+        pd.Series(np.asarray(uniques, dtype=object)), errors="coerce"
+    ).to_numpy(dtype=float)
+    return np.where(codes >= 0, values[codes] if len(values) else np.nan, np.nan)
+
+
+def _blank(series: pd.Series) -> np.ndarray:
+    missing = series.isna().to_numpy()
+    if missing.all():
+        # Also covers the float all-null column of a field missing from the file
+        return missing
+    # Keys are mostly distinct, so this is checked directly rather than per unique value
+    whitespace = series.str.isspace().to_numpy(dtype=bool, na_value=False)
+    return missing | series.isin([""]).to_numpy() | whitespace
+
+
+def _not_matching(df: pd.DataFrame, field: str, pattern: str) -> np.ndarray:
+    return _unique_mask(df[field], lambda v: ~v.str.strip().str.fullmatch(pattern))
+
+
+def _not_numeric(df: pd.DataFrame, field: str) -> np.ndarray:
+    return _unique_mask(
+        df[field], lambda v: pd.to_numeric(v, errors="coerce").isna().to_numpy()
+    )
+
+
+def _mrp_below_selling_price(df: pd.DataFrame) -> np.ndarray:
+    # Rows missing either price are left to the other checks
+    with np.errstate(invalid="ignore"):
+        return _numbers(df["MRP"]) < _numbers(df["Selling Price"])
+
+
+CHECKS = (
+    Check(
+        "Vendor Style Code",
+        "required",
+        ("Vendor Style Code",),
+        lambda df: _blank(df["Vendor Style Code"]),
+    ),
+    Check(
+        "MRP",
+        "below selling price",
+        ("MRP", "Selling Price"),
+        _mrp_below_selling_price,
+    ),
+    Check("MRP", "not numeric", ("MRP",), lambda df: _not_numeric(df, "MRP")),
+    Check(
+        "GTIN",
+        "malformed (8, 12, 13 or 14 digits)",
+        ("GTIN",),
+        lambda df: _not_matching(df, "GTIN", r"\d{8}|\d{12,14}"),
+    ),
+    Check(
+        "HSN Code",
+        "malformed (4, 6 or 8 digits)",
+        ("HSN Code",),
+        lambda df: _not_matching(df, "HSN Code", r"\d{4}|\d{6}|\d{8}"),
+    ),
+) + tuple(
+    Check(field, "not numeric", (field,), lambda df, field=field: _not_numeric(df, field))
+    for field in PACKAGE_FIELDS
+)
+
+
+def _check_labels(checks: tuple, attribute: str, check_codes: np.ndarray):
+    # Errors store an index into `checks`; labels become category codes, not strings
+    label_codes, labels = pd.factorize(
+        pd.Index([getattr(check, attribute) for check in checks])
+    )
+    return pd.Categorical.from_codes(label_codes[check_codes], labels)
+
+
+class Validation(NamedTuple):
+    """
+    Result of validating a catalog: the error table and a mask of rejected rows.
+    """
+
+    errors: pd.DataFrame
+    invalid_rows: np.ndarray
+
+    @property
+    def invalid_count(self) -> int:
+        return int(self.invalid_rows.sum())
+
+
+def validate_catalog(
+    transformed_df: pd.DataFrame, checks: tuple = CHECKS, row_offset: int = 0
+) -> Validation:
+    """
+    Runs every applicable check as a vectorized mask over a converted catalog.
+    Only failing rows are materialized, so the error table is as small as the
+    problems and memory stays linear in the row count. `row_offset` numbers the
+    rows of a chunk within the whole file.
+    """
+    invalid_rows = np.zeros(len(transformed_df), dtype=bool)
+    rows, check_codes = [], []
+    for code, check in enumerate(checks):
+        if not all(field in transformed_df.columns for field in check.fields):
+            continue
+        failing = np.flatnonzero(check.invalid(transformed_df))
+        if len(failing) == 0:
+            continue
+        invalid_rows[failing] = True
+        rows.append(failing + row_offset)
+        check_codes.append(np.full(len(failing), code, dtype=np.int16))
+    if not rows:
+        return Validation(empty_errors(), invalid_rows)
+    rows, check_codes = np.concatenate(rows), np.concatenate(check_codes)
+    order = np.argsort(rows, kind="stable")
+    check_codes = check_codes[order]
+    errors = pd.DataFrame(
+        {
+            "row": rows[order],
+            "field": _check_labels(checks, "field", check_codes),
+            "rule": _check_labels(checks, "rule", check_codes),
+        }
+    )
+    return Validation(errors, invalid_rows)
+
+
+def empty_errors() -> pd.DataFrame:
+    # `row` is the 0-based row of the converted catalog
+    return pd.DataFrame(
+        {
+            "row": pd.Series([], dtype="int64"),
+            "field": pd.Categorical([]),
+            "rule": pd.Categorical([]),
+        }
+    )
+
+
+def concat_errors(tables: list) -> pd.DataFrame:
+    """
+    Joins per-chunk error tables; the field/rule categories are unioned.
+    """
+    tables = [table for table in tables if len(table)]
+    if not tables:
+        return empty_errors()
+    errors = pd.concat(
+        [table.astype({"field": object, "rule": object}) for table in tables],
+        ignore_index=True,
+    )
+    return errors.astype({"field": "category", "rule": "category"})
+
+
+def describe_errors(errors: pd.DataFrame) -> str:
+    """
+    Failure counts per field and rule, most frequent first.
+    """
+    counts = errors.groupby(["field", "rule"], observed=True).size()
+    return ", ".join(
+        f"{field} {rule}: {count}"
+        for (field, rule), count in counts.sort_values(ascending=False).items()
+    )
+
+
+class RowValidator:
+    """
+    Validates a converted catalog (whole or chunk by chunk) and splits it: `split`
+    returns (clean rows, rejected rows) and appends the rejected ones to `sink` in
+    the output format. After `close`, `errors` holds the error table for the whole
+    file.
+    """
+
+    def __init__(self, sink, output_format: str, columns: list, checks: tuple = CHECKS):
+        self.sink = sink
+        self.checks = checks
+        self.invalid_count = 0
+        self._writer = ChunkedWriter(sink, output_format, columns)
+        self._errors = []
+        self._rows_seen = 0
+
+    def split(self, transformed_df: pd.DataFrame) -> tuple:
+        """
+        Returns (clean rows, rejected rows) of `transformed_df`, writing the
+        rejected ones to `sink`; both keep the frame's index and columns.
+        """
+        validation = validate_catalog(transformed_df, self.checks, self._rows_seen)
+        self._rows_seen += len(transformed_df)
+        if validation.invalid_count == 0:
+            return transformed_df, transformed_df.iloc[:0]
+        self._errors.append(validation.errors)
+        self.invalid_count += validation.invalid_count
+        rejected = transformed_df[validation.invalid_rows]
+        self._writer.write(rejected)
+        return transformed_df[~validation.invalid_rows], rejected
+
+    def close(self):
+        self._writer.close()
+        self.sink.seek(0)
+
+    @property
+    def errors(self) -> pd.DataFrame:
+        return concat_errors(self._errors)
@@ -0,0 +1,128 @@
+import io
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc
+import pyarrow.parquet as pq
+
+# Output format -> (file extension, MIME type)
+OUTPUT_FORMATS = {
+    "csv": ("csv", "text/csv"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+    "arrow": ("arrow", "application/vnd.apache.arrow.file"),
+}
+# Arrow IPC columns whose distinct values are at most this share of the rows are
+# dictionary-encoded (Brand Name, Size, Color Family, Country Of Origin, ...)
+DICTIONARY_MAX_RATIO = 0.5
+COMPRESSION = "zstd"
+
+
+def output_file_name(file_name: str, output_format: str = "csv") -> str:
+    """
+    Download name for a converted upload. CSV output keeps the original name.
+    """
+    if output_format == "csv":
+        return f"LR_{file_name}"
+    stem, _ = os.path.splitext(file_name)
+    return f"LR_{stem}.{OUTPUT_FORMATS[output_format][0]}"
+
+
+def output_mime(output_format: str = "csv") -> str:
+    return OUTPUT_FORMATS[output_format][1]
+
+
+def to_arrow(df: pd.DataFrame) -> pa.Table:
+    """
+    Converts a transformed catalog to an Arrow table with every LR field typed as a
+    string, so all-null fields and every chunk of a streamed file share one schema.
+    """
+    schema = pa.schema([(str(column), pa.string()) for column in df.columns])
+    return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+
+def dictionary_encode_repetitive(table: pa.Table) -> pa.Table:
+    if table.num_rows == 0:
+        return table
+    columns = []
+    for column in table.columns:
+        distinct = pc.count_distinct(column).as_py()
+        if distinct <= table.num_rows * DICTIONARY_MAX_RATIO:
+            column = column.dictionary_encode()
+        columns.append(column)
+    return pa.Table.from_arrays(columns, names=table.column_names)
+
+
+def write_csv(transformed_df: pd.DataFrame) -> io.BytesIO:
+    """
+    Serializes a transformed catalog to an in-memory CSV buffer.
+    """
+    output = io.BytesIO()
+    transformed_df.to_csv(output, index=False)
+    output.seek(0)
+    return output
+
+
+def write_output(transformed_df: pd.DataFrame, output_format: str = "csv") -> io.BytesIO:
+    """
+    Serializes a transformed catalog as CSV, Parquet (dictionary-encoded, zstd) or
+    an Arrow IPC file (repetitive columns dictionary-encoded, zstd).
+    """
+    if output_format == "csv":
+        return write_csv(transformed_df)
+    output = io.BytesIO()
+    table = to_arrow(transformed_df)
+    if output_format == "parquet":
+        pq.write_table(table, output, compression=COMPRESSION, use_dictionary=True)
+    elif output_format == "arrow":
+        table = dictionary_encode_repetitive(table)
+        options = pa.ipc.IpcWriteOptions(compression=COMPRESSION)
+        with pa.ipc.new_file(output, table.schema, options=options) as writer:
+            writer.write_table(table)
+    else:
+        raise ValueError(f"Unknown output format: {output_format}")
+    output.seek(0)
+    return output
+
+
+class ChunkedWriter:
+    """
+    Appends transformed chunks to `sink` in one output format, writing the CSV
+    header or the Arrow/Parquet schema once. Streamed Arrow IPC output keeps plain
+    string columns, since a file's dictionaries cannot change between batches.
+    """
+
+    def __init__(self, sink, output_format: str, columns: list):
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format: {output_format}")
+        self.sink = sink
+        self.output_format = output_format
+        self.columns = columns
+        self._header_written = False
+        self._writer = None
+
+    def write(self, transformed_df: pd.DataFrame):
+        if self.output_format == "csv":
+            transformed_df.to_csv(
+                self.sink, index=False, header=not self._header_written
+            )
+            self._header_written = True
+            return
+        table = to_arrow(transformed_df)
+        if self._writer is None:
+            if self.output_format == "parquet":
+                self._writer = pq.ParquetWriter(
+                    self.sink, table.schema, compression=COMPRESSION
+                )
+            else:
+                options = pa.ipc.IpcWriteOptions(compression=COMPRESSION)
+                self._writer = pa.ipc.new_file(self.sink, table.schema, options=options)
+        self._writer.write_table(table)
+
+    def close(self):
+        if not self._header_written and self._writer is None:
+            # Header-only input still produces a header-only (or schema-only) file
+            self.write(pd.DataFrame(columns=self.columns))
+        if self._writer is not None:
+            self._writer.close()